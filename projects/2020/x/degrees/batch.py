@@ -0,0 +1,114 @@
+import json
+from multiprocessing import Pool
+
+from graph import load_graph
+
+# Graph loaded by each worker process of a batch pool
+worker_graph = None
+
+
+def read_queries(f):
+    """
+    Reads tab-separated source and target pairs, one per line.
+    Each side may be a person's name, optionally followed by their
+    birth year in parentheses, or IMDB id. Quotes are kept as part of
+    the name.
+
+    A line without exactly one tab is read as (line, None), which
+    `run_batch` reports as an error for that query.
+    """
+    queries = []
+    for line in f:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        row = line.split("\t")
+        if len(row) != 2:
+            queries.append((line, None))
+            continue
+        queries.append((row[0].strip(), row[1].strip()))
+    return queries
+
+
+def resolve_person(graph, query):
+    """
+    Returns the person id for an IMDB id or a name, resolving
+    ambiguous and misspelled names with `NameIndex.resolve`.
+    """
+    if query in graph.person_index:
+        return query
+    return graph.names().resolve(query)
+
+
+def answer_group(graph, source, targets):
+    """
+    Returns the shortest path from `source` to each of `targets`,
+    using a single breadth-first tree for all of them.
+    """
+    tree = graph.bfs_tree(source, targets)
+    return [graph.path_in_tree(tree, target) for target in targets]
+
+
+def init_worker(directory, options):
+    global worker_graph
+    worker_graph = load_graph(directory, **options)
+
+
+def answer_group_in_worker(group):
+    source, targets = group
+    return answer_group(worker_graph, source, targets)
+
+
+def run_batch(graph, queries, directory=None, processes=1, options=None):
+    """
+    Answers many (source, target) queries against one loaded graph.
+
+    Queries sharing a source are grouped so that one search serves all
+    of them. If `processes` is more than 1, groups are fanned out across
+    a process pool whose workers load the graph from `directory` with
+    the same `load_graph` filter options.
+
+    Returns one result dictionary per query, in order, holding the
+    person ids each side resolved to.
+    """
+    if processes > 1 and directory is None:
+        raise ValueError("A data directory is needed to answer queries in more than one process")
+    if options is None:
+        options = {}
+
+    results = []
+    groups = {}
+    for query_source, query_target in queries:
+        result = {"source": query_source, "target": query_target}
+        results.append(result)
+        if query_target is None:
+            result["error"] = "Expected a source and target separated by a tab."
+            continue
+        source = resolve_person(graph, query_source)
+        target = resolve_person(graph, query_target)
+        result["source_id"], result["target_id"] = source, target
+        if source is None or target is None:
+            result["error"] = "Person not found."
+            continue
+        groups.setdefault(source, []).append((target, result))
+
+    jobs = [(source, [target for target, _ in members]) for source, members in groups.items()]
+    if processes > 1 and len(jobs) > 1:
+        with Pool(processes, initializer=init_worker, initargs=(directory, options)) as pool:
+            answers = pool.map(answer_group_in_worker, jobs)
+    else:
+        answers = [answer_group(graph, source, targets) for source, targets in jobs]
+
+    for members, paths in zip(groups.values(), answers):
+        for (_, result), path in zip(members, paths):
+            result["path"] = path
+            result["degrees"] = None if path is None else len(path)
+    return results
+
+
+def write_results(results, f):
+    """
+    Writes batch results as JSON, one line per query.
+    """
+    for result in results:
+        f.write(json.dumps(result) + "\n")
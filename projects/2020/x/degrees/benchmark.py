@@ -0,0 +1,207 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate
+
+import degrees
+from graph import load_graph
+from util import SearchStats
+
+# Letters that synthetic names are built from, as consonant-vowel-coda syllables
+ONSETS = ["", "b", "br", "c", "ch", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "sh",
+          "st", "t", "th", "v", "w", "z"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "ie", "ou", "y"]
+CODAS = ["", "", "", "l", "n", "r", "s", "t", "ck", "m", "nd", "rt"]
+
+
+def generate_dataset(directory, people=10000, movies=5000, cast_exponent=1.5,
+                     popularity_exponent=1.0, max_cast=100, seed=0):
+    """
+    Writes synthetic people.csv, movies.csv and stars.csv files.
+
+    Cast sizes follow a Pareto distribution with `cast_exponent`, and
+    actors are cast with Zipf-like popularity, so a few hubs star in
+    many movies as in the IMDB data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            writer.writerow([i + 1, synthetic_name(rng), rng.randint(1900, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(movies):
+            writer.writerow([i + 1, f"Movie {i + 1}", rng.randint(1920, 2020)])
+
+    person_ids = range(1, people + 1)
+    cum_weights = list(accumulate(1 / rank ** popularity_exponent for rank in person_ids))
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in range(1, movies + 1):
+            cast = min(int(rng.paretovariate(cast_exponent)) + 1, max_cast, people)
+            for person_id in set(rng.choices(person_ids, cum_weights=cum_weights, k=cast)):
+                writer.writerow([person_id, movie_id])
+
+
+def synthetic_name(rng):
+    """
+    Returns a random "First Last" name of two to four syllables each.
+    """
+    def word():
+        return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+                       for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{word()} {word()}"
+
+
+def misspell(name, rng):
+    """
+    Returns a name with one character deleted, replaced or doubled.
+    """
+    i = rng.randrange(len(name))
+    edit = rng.randrange(3)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + rng.choice("aeiourstln") + name[i + 1:]
+    return name[:i] + name[i] + name[i:]
+
+
+def measure_names(index, names, queries=1000, seed=0):
+    """
+    Returns how many exact and misspelled names a NameIndex resolves
+    per second, and the fraction of misspellings resolved to a person
+    with the intended name.
+    """
+    rng = random.Random(seed)
+    exact = [rng.choice(names) for _ in range(queries)]
+    misspelled = [misspell(name, rng) for name in exact]
+
+    # Timed without `measure`, since tracing allocations slows lookups a lot
+    start = time.perf_counter()
+    for name in exact:
+        index.resolve(name)
+    exact_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    resolved = [index.resolve(name) for name in misspelled]
+    fuzzy_seconds = time.perf_counter() - start
+    names_by_id = dict(zip(index.person_ids, index.lowered))
+    correct = sum(person_id is not None and names_by_id[person_id] == name.lower()
+                  for person_id, name in zip(resolved, exact))
+    return queries / exact_seconds, queries / fuzzy_seconds, correct / queries
+
+
+def measure(function, *args):
+    """
+    Calls a function, returning its result, the wall time taken in
+    seconds and the peak memory allocated in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def sample_queries(person_ids, count, seed=0):
+    """
+    Returns `count` random (source, target) pairs of person_ids.
+    """
+    rng = random.Random(seed)
+    return [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(count)]
+
+
+def run_benchmark(directory, queries=100, seed=0):
+    """
+    Times loading, neighbor lookups and searches on the dataset in
+    `directory`, returning a dictionary of measurements.
+    """
+    report = {}
+
+    for table in [degrees.names, degrees.people, degrees.movies]:
+        table.clear()
+    _, report["load_data_seconds"], report["load_data_peak_bytes"] = measure(degrees.load_data, directory)
+    person_ids = sorted(degrees.people)
+    pairs = sample_queries(person_ids, queries, seed)
+
+    def neighbor_lookups():
+        for source, _ in pairs:
+            degrees.neighbors_for_person(source)
+    _, report["neighbors_seconds"], _ = measure(neighbor_lookups)
+
+    for name, search in [("shortest_path", degrees.shortest_path),
+                         ("bidirectional_shortest_path", degrees.bidirectional_shortest_path)]:
+        degrees.costar_cache.clear()
+        expanded = []
+
+        def searches():
+            for source, target in pairs:
+                stats = SearchStats()
+                search(source, target, stats)
+                expanded.append(stats.expanded)
+        _, seconds, peak = measure(searches)
+        report[f"{name}_seconds"] = seconds
+        report[f"{name}_peak_bytes"] = peak
+        report[f"{name}_expanded"] = sum(expanded)
+
+    index = degrees.loaded_names()
+    report["resolve_exact_per_second"], report["resolve_fuzzy_per_second"], report["resolve_fuzzy_accuracy"] = \
+        measure_names(index, index.names, queries, seed)
+
+    graph, report["load_graph_seconds"], report["load_graph_peak_bytes"] = measure(
+        lambda: load_graph(directory, snapshot=False))
+
+    expanded = []
+
+    def graph_searches():
+        for source, target in pairs:
+            stats = SearchStats()
+            graph.shortest_path(source, target, stats)
+            expanded.append(stats.expanded)
+    _, report["graph_shortest_path_seconds"], report["graph_shortest_path_peak_bytes"] = measure(graph_searches)
+    report["graph_shortest_path_expanded"] = sum(expanded)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees on real or synthetic data.")
+    parser.add_argument("directory", nargs="?",
+                        help="dataset to benchmark; a synthetic one is generated if omitted")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.directory is not None:
+        report = run_benchmark(args.directory, args.queries, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            generate_dataset(directory, args.people, args.movies, seed=args.seed)
+            report = run_benchmark(directory, args.queries, args.seed)
+
+    for key, value in report.items():
+        if key.endswith("_seconds"):
+            print(f"{key}: {value:.4f}")
+        elif isinstance(value, float):
+            print(f"{key}: {value:.2f}")
+        else:
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
-import csv
+import argparse
+import heapq
+import json
+import random
 import sys
+from functools import lru_cache
 
-from util import Node, StackFrontier, QueueFrontier
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier, LRUCache, finish_search
+from graph import load_graph
+from ingest import load_tables, star_chunks
+from nameindex import NameIndex
+from batch import read_queries, run_batch, write_results
+from parallel import ParallelBFS
+from server import serve
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,64 +22,170 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps person_ids to the id of their connected component
+components = {}
 
-def load_data(directory):
+# Maps component ids to the number of people in them
+component_sizes = {}
+
+# Maps person_ids to their co-stars when precomputed by precompute_costars
+costars = {}
+
+# Number of people whose co-stars are memoized when not precomputed
+COSTAR_CACHE_SIZE = 100000
+
+# Co-stars of the most recently expanded people
+costar_cache = LRUCache(COSTAR_CACHE_SIZE)
+
+
+def load_data(directory, min_year=None, max_year=None, drop_isolated=False):
     """
     Load data from CSV files into memory.
+
+    Only movies released between `min_year` and `max_year` are kept,
+    and if `drop_isolated` is true, so are only people and movies
+    with at least one star credit.
     """
+    people_rows, movie_rows = load_tables(directory, min_year, max_year, drop_isolated)
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    for person_id, (name, birth) in people_rows.items():
+        people[person_id] = {
+            "name": name,
+            "birth": birth,
+            "movies": set()
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    for movie_id, (title, year) in movie_rows.items():
+        movies[movie_id] = {
+            "title": title,
+            "year": year,
+            "stars": set()
+        }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    for chunk in star_chunks(directory, people_rows, movie_rows):
+        for person_id, movie_id in chunk:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+
+    costars.clear()
+    costar_cache.clear()
+    loaded_names.cache_clear()
+    label_components()
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person without movies to the loaded data.
+    """
+    if person_id in people:
+        return
+    people[person_id] = {
+        "name": name,
+        "birth": birth,
+        "movies": set()
+    }
+    names.setdefault(name.lower(), set()).add(person_id)
+    components[person_id] = person_id
+    component_sizes[person_id] = 1
+    if costars:
+        costars[person_id] = find_costars(person_id)
+    loaded_names.cache_clear()
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie without stars to the loaded data.
+    """
+    if movie_id in movies:
+        return
+    movies[movie_id] = {
+        "title": title,
+        "year": year,
+        "stars": set()
+    }
+
+
+def add_star(person_id, movie_id):
+    """
+    Credits a loaded person in a loaded movie, updating only the
+    co-stars and component labels of the people it affects.
+
+    Landmark indexes built before the update may no longer be
+    admissible and should be rebuilt.
+
+    Returns the person_ids whose co-stars changed.
+    """
+    movie = movies[movie_id]
+    if movie_id in people[person_id]["movies"]:
+        return set()
+    for star_id in movie["stars"]:
+        merge_components(person_id, star_id)
+        break
+
+    people[person_id]["movies"].add(movie_id)
+    movie["stars"].add(person_id)
+    for star_id in movie["stars"]:
+        costar_cache.discard(star_id)
+        if costars:
+            costars[star_id] = find_costars(star_id)
+    return set(movie["stars"])
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Find degrees of separation between actors.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated source/target pairs from FILE ('-' for stdin)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="number of worker processes for batch mode or a parallel search")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="serve JSON line queries on host:port or a Unix socket path")
+    parser.add_argument("--min-year", type=int, help="ignore movies released before this year")
+    parser.add_argument("--max-year", type=int, help="ignore movies released after this year")
+    parser.add_argument("--drop-isolated", action="store_true",
+                        help="leave out people and movies without star credits")
+    args = parser.parse_args()
+    directory = args.directory
+    options = {"min_year": args.min_year, "max_year": args.max_year, "drop_isolated": args.drop_isolated}
+
+    if args.serve is not None:
+        serve(load_graph(directory, **options), args.serve)
+        return
 
-    # Load data from files into memory
+    if args.batch is not None:
+        graph = load_graph(directory, **options)
+        if args.batch == "-":
+            queries = read_queries(sys.stdin)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                queries = read_queries(f)
+        write_results(run_batch(graph, queries, directory, args.processes, options), sys.stdout)
+        return
+
+    # Load data from files into memory, reusing a snapshot if present
     print("Loading data...")
-    load_data(directory)
+    graph = load_graph(directory, **options)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), graph)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), graph)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.processes > 1:
+        with ParallelBFS(graph, args.processes) as search:
+            path = search.shortest_path(source, target)
+    else:
+        path = graph.shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,44 +194,406 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person(path[i][1])["name"]
+            person2 = graph.person(path[i + 1][1])["name"]
+            movie = graph.movie(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If `stats` is a SearchStats, it is filled in as the search runs.
     """
-    explored = []
+    if stats is not None:
+        stats.start()
+    if not connected(source, target):
+        return finish_search(stats, None, "not connected")
+
+    explored = set()
     frontier = QueueFrontier()
 
-    for neighbor in neighbors_for_person(source):
-        if neighbor[1] == target:
-            return [neighbor]
+    for person_id, movie_id in costars_for_person(source).items():
+        if person_id == target:
+            return finish_search(stats, [(movie_id, person_id)], "found")
 
-        frontier.add(Node(neighbor[1], None, neighbor[0]))
+        frontier.add(Node(person_id, None, movie_id))
 
     while True:
         if frontier.empty():
-            return None
+            return finish_search(stats, None, "exhausted")
 
         node = frontier.remove()
-        explored.append(node.state)
+        explored.add(node.state)
+        if stats is not None:
+            stats.expand(node.depth + 1, len(frontier.frontier) + 1)
 
         # Expand node, add resulting nodes to the frontier if they aren't already in the frontier or the explored set
-        for movie_id, person_id in neighbors_for_person(node.state):
+        for person_id, movie_id in costars_for_person(node.state).items():
             if person_id == target:
-                return get_path(Node(person_id, node, movie_id))
+                return finish_search(stats, get_path(Node(person_id, node, movie_id)), "found")
 
             if person_id not in explored and not frontier.contains_state(person_id):
                 frontier.add(Node(person_id, node, movie_id))
 
 
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one breadth-first
+    frontier from each end and stopping as soon as they meet.
+
+    If no possible path, returns None.
+
+    If `stats` is a SearchStats, it is filled in as the search runs.
+    """
+    if stats is not None:
+        stats.start()
+    if not connected(source, target):
+        return finish_search(stats, None, "not connected")
+
+    for person_id, movie_id in costars_for_person(source).items():
+        if person_id == target:
+            return finish_search(stats, [(movie_id, person_id)], "found")
+
+    # Maps each reached person to the (movie_id, person_id) step
+    # leading back towards the side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    forward_level = backward_level = 0
+
+    while forward_frontier and backward_frontier:
+        # Expand whichever side has the smaller frontier level
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_level += 1
+            if stats is not None:
+                stats.expand(forward_level, len(forward_frontier), len(forward_frontier), "forward")
+            forward_frontier, meeting = expand_level(forward_frontier, forward, backward)
+        else:
+            backward_level += 1
+            if stats is not None:
+                stats.expand(backward_level, len(backward_frontier), len(backward_frontier), "backward")
+            backward_frontier, meeting = expand_level(backward_frontier, backward, forward)
+
+        if meeting is not None:
+            return finish_search(stats, join_paths(meeting, forward, backward), "found")
+
+    return finish_search(stats, None, "exhausted")
+
+
+def expand_level(frontier, parents, other_parents):
+    """
+    Expands every person in a frontier level, recording parents for
+    newly reached people. Returns the next level and the person where
+    the search met the other side, or None if the sides did not meet.
+    """
+    next_frontier = []
+    for person_id in frontier:
+        for neighbor_id, movie_id in costars_for_person(person_id).items():
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            if neighbor_id in other_parents:
+                return next_frontier, neighbor_id
+            next_frontier.append(neighbor_id)
+    return next_frontier, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the source to target path through the person where the
+    forward and backward searches met.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def astar_shortest_path(source, target, landmarks):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search with
+    landmark distance lower bounds as the heuristic.
+
+    If no possible path, returns None.
+    """
+    if not connected(source, target):
+        return None
+
+    for person_id, movie_id in costars_for_person(source).items():
+        if person_id == target:
+            return [(movie_id, person_id)]
+
+    if source == target or landmark_lower_bound(landmarks, source, target) == float("inf"):
+        return None
+
+    # Cost of the cheapest known path to each person
+    costs = {source: 0}
+    explored = set()
+    frontier = PriorityFrontier()
+    frontier.add(Node(source, None, None), landmark_lower_bound(landmarks, source, target))
+
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state in explored:
+            continue
+        if node.state == target:
+            return get_path(node)[1:]
+        explored.add(node.state)
+
+        cost = costs[node.state] + 1
+        for person_id, movie_id in costars_for_person(node.state).items():
+            if person_id in explored or costs.get(person_id, cost + 1) <= cost:
+                continue
+            costs[person_id] = cost
+            priority = cost + landmark_lower_bound(landmarks, person_id, target)
+            frontier.add(Node(person_id, node, movie_id), priority)
+
+    return None
+
+
+def bfs_distances(source):
+    """
+    Returns the number of steps from `source` to every person it can reach.
+    """
+    distances = {source: 0}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            distance = distances[person_id] + 1
+            for neighbor_id in costars_for_person(person_id):
+                if neighbor_id not in distances:
+                    distances[neighbor_id] = distance
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return distances
+
+
+def build_landmarks(landmark_ids=None, count=4):
+    """
+    Returns a landmark index mapping each landmark's person_id to
+    its distance from every person it can reach.
+
+    If no landmarks are given, the `count` people with the most
+    movies are used as hubs.
+    """
+    if landmark_ids is None:
+        landmark_ids = sorted(people, key=lambda person_id: len(people[person_id]["movies"]), reverse=True)[:count]
+    return {landmark_id: bfs_distances(landmark_id) for landmark_id in landmark_ids}
+
+
+def save_landmarks(landmarks, filename):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(landmarks, f)
+
+
+def load_landmarks(filename):
+    with open(filename, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def landmark_lower_bound(landmarks, source, target):
+    """
+    Returns a lower bound on the number of steps between two people,
+    which is infinite if a landmark reaches only one of them.
+    """
+    bound = 0
+    for distances in landmarks.values():
+        source_distance = distances.get(source)
+        target_distance = distances.get(target)
+        if source_distance is None and target_distance is None:
+            continue
+        if source_distance is None or target_distance is None:
+            return float("inf")
+        bound = max(bound, abs(source_distance - target_distance))
+    return bound
+
+
+def landmark_upper_bound(landmarks, source, target):
+    """
+    Returns an upper bound on the number of steps between two people
+    through any landmark, or infinity if no landmark reaches both.
+    """
+    bound = float("inf")
+    for distances in landmarks.values():
+        if source in distances and target in distances:
+            bound = min(bound, distances[source] + distances[target])
+    return bound
+
+
+def within_distance(landmarks, source, target, k):
+    """
+    Returns whether two people are at most `k` steps apart, or None
+    if the landmark bounds cannot decide without a search.
+    """
+    if landmark_upper_bound(landmarks, source, target) <= k:
+        return True
+    if landmark_lower_bound(landmarks, source, target) > k:
+        return False
+    return None
+
+
+def shortest_path_dag(source, target):
+    """
+    Returns every shortest path from the source to the target as a
+    DAG of breadth-first parents: a dictionary mapping each person on
+    some shortest path to the list of (movie_id, parent_person_id)
+    steps that reach them from the previous level.
+
+    A person is their own target through any one of their movies, as
+    in `shortest_path`; those one-step paths start from a None parent.
+
+    If no possible path, returns None.
+    """
+    if not connected(source, target):
+        return None
+    if source == target:
+        steps = sorted((movie_id, None) for movie_id in people[source]["movies"])
+        return {source: steps, None: []} if steps else None
+
+    depths = {source: 0}
+    dag = {source: []}
+    frontier = [source]
+    while frontier and target not in depths:
+        next_frontier = []
+        for person_id in frontier:
+            depth = depths[person_id] + 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id not in depths:
+                    depths[neighbor_id] = depth
+                    dag[neighbor_id] = []
+                    next_frontier.append(neighbor_id)
+                if depths[neighbor_id] == depth:
+                    dag[neighbor_id].append((movie_id, person_id))
+        frontier = next_frontier
+
+    if target not in depths:
+        return None
+
+    # Keep only the people that lead to the target
+    kept = {target}
+    stack = [target]
+    while stack:
+        for _, parent_id in dag[stack.pop()]:
+            if parent_id not in kept:
+                kept.add(parent_id)
+                stack.append(parent_id)
+    return {person_id: dag[person_id] for person_id in kept}
+
+
+def count_paths(dag, target):
+    """
+    Returns the number of shortest paths in `dag` that end at the target.
+    """
+    return path_counts(dag, target)[target]
+
+
+def path_counts(dag, target):
+    """
+    Returns the number of shortest paths from the source to each person of `dag`.
+    """
+    counts = {}
+    for person_id in dag_order(dag, target):
+        parents = dag[person_id]
+        counts[person_id] = sum(counts[parent_id] for _, parent_id in parents) if parents else 1
+    return counts
+
+
+def dag_order(dag, target):
+    """
+    Returns the people of `dag` ordered so every parent precedes its children.
+    """
+    order = []
+    visited = set()
+    stack = [(target, False)]
+    while stack:
+        person_id, expanded = stack.pop()
+        if expanded:
+            order.append(person_id)
+            continue
+        if person_id in visited:
+            continue
+        visited.add(person_id)
+        stack.append((person_id, True))
+        for _, parent_id in dag[person_id]:
+            if parent_id not in visited:
+                stack.append((parent_id, False))
+    return order
+
+
+def top_shortest_paths(dag, target, k, score=None):
+    """
+    Returns up to `k` shortest paths in `dag`, as lists of
+    (movie_id, person_id) pairs, with the highest total score of their
+    movies first. By default a movie's score is its release year.
+    """
+    if score is None:
+        score = movie_year
+
+    # Best score of any path from the source to each person
+    best = {}
+    for person_id in dag_order(dag, target):
+        parents = dag[person_id]
+        best[person_id] = max(best[parent_id] + score(movie_id) for movie_id, parent_id in parents) if parents else 0
+
+    # Best-first search backwards from the target, exact since `best` is
+    # the highest score still reachable from each person, so paths come
+    # out in order of their total score
+    paths = []
+    counter = 0
+    frontier = [(-best[target], counter, 0, target, [])]
+    while frontier and len(paths) < k:
+        _, _, total, person_id, path = heapq.heappop(frontier)
+        if not dag[person_id]:
+            paths.append(path)
+            continue
+        for movie_id, parent_id in dag[person_id]:
+            counter += 1
+            parent_total = total + score(movie_id)
+            heapq.heappush(frontier, (
+                -(parent_total + best[parent_id]), counter, parent_total,
+                parent_id, [(movie_id, person_id)] + path))
+    return paths
+
+
+def sample_shortest_path(dag, target, rng=random):
+    """
+    Returns a shortest path in `dag` chosen uniformly at random.
+    """
+    counts = path_counts(dag, target)
+    path = []
+    person_id = target
+    while dag[person_id]:
+        parents = dag[person_id]
+        weights = [counts[parent_id] for _, parent_id in parents]
+        movie_id, parent_id = rng.choices(parents, weights=weights)[0]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    return path[::-1]
+
+
+def movie_year(movie_id):
+    year = movies[movie_id]["year"]
+    return int(year) if year.isdigit() else 0
+
+
 def get_path(node):
     path = []
     while True:
@@ -125,18 +603,33 @@ def get_path(node):
             return path[::-1]
 
 
-def person_id_for_name(name):
+def person_id_for_name(name, graph=None, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Looks the name up in `graph` if given, otherwise in the
+    dictionaries filled by `load_data`. If `interactive` is false,
+    ambiguous or misspelled names are resolved by `NameIndex.resolve`
+    instead of asking the user.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if not interactive:
+        index = loaded_names() if graph is None else graph.names()
+        return index.resolve(name)
+
+    if graph is None:
+        person_ids = list(names.get(name.lower(), set()))
+        person_for_id = people.get
+    else:
+        person_ids = graph.person_ids_for_name(name)
+        person_for_id = graph.person
+
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = person_for_id(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -151,6 +644,19 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+@lru_cache(maxsize=1)
+def loaded_names():
+    """
+    Returns a NameIndex over the people filled by `load_data`.
+    """
+    person_ids = list(people)
+    return NameIndex(
+        person_ids,
+        [people[person_id]["name"] for person_id in person_ids],
+        [people[person_id]["birth"] for person_id in person_ids],
+        [len(people[person_id]["movies"]) for person_id in person_ids])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -164,5 +670,103 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def label_components():
+    """
+    Labels every loaded person with the id of their connected component,
+    found by union-find over the people starring in each movie.
+    """
+    parents = {person_id: person_id for person_id in people}
+
+    def find(person_id):
+        while parents[person_id] != person_id:
+            parents[person_id] = parents[parents[person_id]]
+            person_id = parents[person_id]
+        return person_id
+
+    for movie in movies.values():
+        root = None
+        for person_id in movie["stars"]:
+            other = find(person_id)
+            if root is None:
+                root = other
+            elif other != root:
+                parents[other] = root
+
+    components.clear()
+    component_sizes.clear()
+    for person_id in people:
+        root = find(person_id)
+        components[person_id] = root
+        component_sizes[root] = component_sizes.get(root, 0) + 1
+
+
+def merge_components(a, b):
+    """
+    Merges the components of two people, relabelling the people of
+    the smaller one.
+    """
+    label_a, label_b = components[a], components[b]
+    if label_a == label_b:
+        return
+    if component_sizes[label_a] > component_sizes[label_b]:
+        a, label_a, label_b = b, label_b, label_a
+
+    # Every person reachable from `a` is in the smaller component
+    members = {a}
+    frontier = [a]
+    while frontier:
+        person_id = frontier.pop()
+        for movie_id in people[person_id]["movies"]:
+            for star_id in movies[movie_id]["stars"]:
+                if star_id not in members:
+                    members.add(star_id)
+                    frontier.append(star_id)
+    for person_id in members:
+        components[person_id] = label_b
+    component_sizes[label_b] += component_sizes.pop(label_a)
+
+
+def connected(source, target):
+    """
+    Returns whether two people are in the same connected component.
+    """
+    return components.get(source) == components.get(target)
+
+
+def costars_for_person(person_id):
+    """
+    Returns a dictionary mapping each person who starred with a given
+    person to one movie they starred in together.
+
+    Uses the precomputed co-stars if available, otherwise an LRU
+    memo of the most recently expanded people.
+    """
+    if costars:
+        return costars[person_id]
+    person_costars = costar_cache.get(person_id)
+    if person_costars is None:
+        person_costars = find_costars(person_id)
+        costar_cache.put(person_id, person_costars)
+    return person_costars
+
+
+def find_costars(person_id):
+    person_costars = {}
+    for movie_id in people[person_id]["movies"]:
+        for costar_id in movies[movie_id]["stars"]:
+            if costar_id not in person_costars:
+                person_costars[costar_id] = movie_id
+    return person_costars
+
+
+def precompute_costars():
+    """
+    Computes the co-stars of every loaded person up front.
+    """
+    costars.clear()
+    for person_id in people:
+        costars[person_id] = find_costars(person_id)
+
+
 if __name__ == "__main__":
     main()
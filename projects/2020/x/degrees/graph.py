@@ -0,0 +1,579 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+
+from ingest import load_tables, star_chunks
+from nameindex import NameIndex
+from util import finish_search
+
+SNAPSHOT_MAGIC = b"DEGSNAP3"
+SNAPSHOT_FILE = "degrees.snapshot"
+CSV_FILES = ["people.csv", "movies.csv", "stars.csv"]
+ARRAY_FIELDS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars", "components"]
+STRING_FIELDS = ["person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years"]
+
+
+class CompactGraph():
+    """
+    Person-movie bipartite graph with ids interned to dense integers.
+
+    Adjacency is stored CSR-style: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+    `components[p]` labels the connected component of person `p`.
+
+    People, movies and star credits added after loading are kept in
+    small overlays next to the CSR arrays until `compact` merges them in.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 components=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        if components is None:
+            components = label_components(len(person_ids), movie_offsets, movie_stars)
+        self.components = components
+        self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.movie_index = None
+        self.name_positions = None
+        self.name_index = None
+
+        # Credits added since loading, and component labels merged by them
+        self.added_movies = {}
+        self.added_stars = {}
+        self.merged_components = {}
+
+        # Where load_graph found this graph, so updates can be saved back
+        self.snapshot_path = None
+        self.signature = None
+
+    def person(self, person_id):
+        """
+        Returns the name and birth year of a person.
+        """
+        p = self.person_index[person_id]
+        return {"name": self.person_names[p], "birth": self.person_births[p]}
+
+    def movie(self, movie_id):
+        """
+        Returns the title and year of a movie.
+        """
+        m = self.movie_position(movie_id)
+        return {"title": self.movie_titles[m], "year": self.movie_years[m]}
+
+    def movie_position(self, movie_id):
+        return self.movie_positions()[movie_id]
+
+    def movie_positions(self):
+        if self.movie_index is None:
+            self.movie_index = {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+        return self.movie_index
+
+    def movies_of(self, p):
+        """
+        Returns the movies of person `p`, including credits added since loading.
+        """
+        if p < len(self.person_offsets) - 1:
+            movies = self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        else:
+            movies = ()
+        added = self.added_movies.get(p)
+        return movies if added is None else list(movies) + added
+
+    def stars_of(self, m):
+        """
+        Returns the stars of movie `m`, including credits added since loading.
+        """
+        if m < len(self.movie_offsets) - 1:
+            stars = self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        else:
+            stars = ()
+        added = self.added_stars.get(m)
+        return stars if added is None else list(stars) + added
+
+    def component_of(self, p):
+        """
+        Returns the component label of person `p`, following merges
+        made by credits added since loading.
+        """
+        label = self.components[p]
+        while label in self.merged_components:
+            label = self.merged_components[label]
+        return label
+
+    def add_person(self, person_id, name, birth):
+        """
+        Adds a person without credits, in a component of their own.
+        """
+        if person_id in self.person_index:
+            return
+        p = len(self.person_ids)
+        self.person_index[person_id] = p
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        if not isinstance(self.components, array):
+            self.components = array("i", bytes(self.components))
+        # Existing labels are below the number of people loaded, so `p` is free
+        self.components.append(p)
+        if self.name_positions is not None:
+            self.name_positions.setdefault(name.lower(), []).append(p)
+        self.name_index = None
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Adds a movie without stars.
+        """
+        movie_index = self.movie_positions()
+        if movie_id in movie_index:
+            return
+        movie_index[movie_id] = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+
+    def add_star(self, person_id, movie_id):
+        """
+        Credits a person in a movie, both already in the graph.
+
+        Returns the component labels, as they were before the update,
+        whose shortest paths may have changed.
+        """
+        p = self.person_index[person_id]
+        m = self.movie_position(movie_id)
+        if m in self.movies_of(p):
+            return set()
+
+        stars = self.stars_of(m)
+        self.added_movies.setdefault(p, []).append(m)
+        self.added_stars.setdefault(m, []).append(p)
+
+        affected = {self.component_of(p)}
+        if len(stars) > 0:
+            other = self.component_of(stars[0])
+            affected.add(other)
+            if other != self.component_of(p):
+                self.merged_components[self.component_of(p)] = other
+        return affected
+
+    def compact(self):
+        """
+        Rebuilds the CSR arrays and component labels to include every
+        credit added since loading.
+        """
+        if not self.added_movies and len(self.person_offsets) - 1 == len(self.person_ids) \
+                and len(self.movie_offsets) - 1 == len(self.movie_ids):
+            return
+        star_people, star_movies = array("i"), array("i")
+        for p in range(len(self.person_ids)):
+            for m in self.movies_of(p):
+                star_people.append(p)
+                star_movies.append(m)
+        self.person_offsets, self.person_movies = build_csr(len(self.person_ids), star_people, star_movies)
+        self.movie_offsets, self.movie_stars = build_csr(len(self.movie_ids), star_movies, star_people)
+        self.components = label_components(len(self.person_ids), self.movie_offsets, self.movie_stars)
+        self.added_movies = {}
+        self.added_stars = {}
+        self.merged_components = {}
+
+    def save_snapshot(self):
+        """
+        Compacts the graph and rewrites the snapshot it was loaded from,
+        so the next `load_graph` maps the updated graph.
+        """
+        self.compact()
+        if self.snapshot_path is not None:
+            write_snapshot(self, self.snapshot_path, self.signature)
+
+    def names(self):
+        """
+        Returns the NameIndex over this graph's people, building it on first use.
+        """
+        if self.name_index is None:
+            credits = [len(self.movies_of(p)) for p in range(len(self.person_ids))]
+            self.name_index = NameIndex(self.person_ids, self.person_names, self.person_births, credits)
+        return self.name_index
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDB ids of every person with the given name.
+        """
+        if self.name_positions is None:
+            self.name_positions = {}
+            for i, person_name in enumerate(self.person_names):
+                self.name_positions.setdefault(person_name.lower(), []).append(i)
+        return [self.person_ids[i] for i in self.name_positions.get(name.lower(), [])]
+
+    def connected(self, source, target):
+        """
+        Returns whether two people are in the same connected component.
+        """
+        return self.component_of(self.person_index[source]) == self.component_of(self.person_index[target])
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for m in self.movies_of(self.person_index[person_id]):
+            for q in self.stars_of(m):
+                neighbors.add((self.movie_ids[m], self.person_ids[q]))
+        return neighbors
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+
+        If `stats` is a SearchStats, it is filled in as the search runs.
+        """
+        if stats is not None:
+            stats.start()
+        s = self.person_index[source]
+        t = self.person_index[target]
+        if s == t:
+            path = self.self_path(s)
+            return finish_search(stats, path, "exhausted" if path is None else "found")
+        if self.component_of(s) != self.component_of(t):
+            return finish_search(stats, None, "not connected")
+
+        # Parent person and movie for each reached person, per side
+        forward_people, forward_movies = {s: -1}, {s: -1}
+        backward_people, backward_movies = {t: -1}, {t: -1}
+        forward_seen, backward_seen = set(), set()
+        forward_frontier, backward_frontier = [s], [t]
+        forward_level = backward_level = 0
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_level += 1
+                if stats is not None:
+                    stats.expand(forward_level, len(forward_frontier), len(forward_frontier), "forward")
+                forward_frontier, meeting = self.expand_level(
+                    forward_frontier, forward_people, forward_movies,
+                    forward_seen, backward_people)
+            else:
+                backward_level += 1
+                if stats is not None:
+                    stats.expand(backward_level, len(backward_frontier), len(backward_frontier), "backward")
+                backward_frontier, meeting = self.expand_level(
+                    backward_frontier, backward_people, backward_movies,
+                    backward_seen, forward_people)
+
+            if meeting is not None:
+                path = self.join_paths(
+                    meeting, forward_people, forward_movies,
+                    backward_people, backward_movies)
+                return finish_search(stats, path, "found")
+
+        return finish_search(stats, None, "exhausted")
+
+    def self_path(self, p):
+        """
+        Returns the one-step path from a person to themselves through
+        one of their movies, matching `degrees.shortest_path`.
+        """
+        movies = self.movies_of(p)
+        if len(movies) == 0:
+            return None
+        return [(self.movie_ids[movies[0]], self.person_ids[p])]
+
+    def bfs_tree(self, source, targets=None):
+        """
+        Runs a breadth-first search from `source`, returning the parent
+        person and parent movie of every reached person. If `targets` is
+        given, the search stops after the level that reaches the last of them.
+        """
+        s = self.person_index[source]
+        parent_people, parent_movies = {s: -1}, {s: -1}
+        remaining = None
+        if targets is not None:
+            # Targets in other components can never be reached
+            remaining = {self.person_index[target] for target in targets}
+            remaining = {t for t in remaining if t != s and self.component_of(t) == self.component_of(s)}
+
+        seen_movies = set()
+        frontier = [s]
+        while frontier and remaining != set():
+            next_frontier = []
+            for p in frontier:
+                for m in self.movies_of(p):
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in self.stars_of(m):
+                        if q in parent_people:
+                            continue
+                        parent_people[q] = p
+                        parent_movies[q] = m
+                        next_frontier.append(q)
+                        if remaining is not None:
+                            remaining.discard(q)
+            frontier = next_frontier
+        return parent_people, parent_movies
+
+    def path_in_tree(self, tree, target):
+        """
+        Returns the (movie_id, person_id) path from the root of a
+        `bfs_tree` to `target`, or None if the tree does not reach it.
+        """
+        parent_people, parent_movies = tree
+        t = self.person_index[target]
+        if parent_people.get(t) == -1:
+            return self.self_path(t)
+        if t not in parent_people:
+            return None
+
+        path = []
+        while parent_people[t] != -1:
+            path.append((self.movie_ids[parent_movies[t]], self.person_ids[t]))
+            t = parent_people[t]
+        path.reverse()
+        return path
+
+    def expand_level(self, frontier, parent_people, parent_movies, seen_movies, other_people):
+        """
+        Expands every person in a frontier level. Each movie's cast is
+        scanned at most once per search, since every star it reaches
+        is recorded the first time. Returns the next level and the person
+        where the search met the other side, or None.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        next_frontier = []
+        for p in frontier:
+            for m in movies_of(p):
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+                for q in stars_of(m):
+                    if q in parent_people:
+                        continue
+                    parent_people[q] = p
+                    parent_movies[q] = m
+                    if q in other_people:
+                        return next_frontier, q
+                    next_frontier.append(q)
+        return next_frontier, None
+
+    def join_paths(self, meeting, forward_people, forward_movies, backward_people, backward_movies):
+        """
+        Builds the (movie_id, person_id) path through the meeting person.
+        """
+        path = []
+        p = meeting
+        while forward_people[p] != -1:
+            path.append((self.movie_ids[forward_movies[p]], self.person_ids[p]))
+            p = forward_people[p]
+        path.reverse()
+
+        p = meeting
+        while backward_people[p] != -1:
+            m = backward_movies[p]
+            p = backward_people[p]
+            path.append((self.movie_ids[m], self.person_ids[p]))
+        return path
+
+
+def label_components(person_count, movie_offsets, movie_stars):
+    """
+    Returns an array labelling each person with a dense component id,
+    found by union-find over the people starring in each movie.
+    """
+    parents = array("i", range(person_count))
+
+    def find(p):
+        while parents[p] != p:
+            parents[p] = parents[parents[p]]
+            p = parents[p]
+        return p
+
+    for m in range(len(movie_offsets) - 1):
+        start, end = movie_offsets[m], movie_offsets[m + 1]
+        if start == end:
+            continue
+        root = find(movie_stars[start])
+        for j in range(start + 1, end):
+            other = find(movie_stars[j])
+            if other != root:
+                parents[other] = root
+
+    labels = array("i", [0]) * person_count
+    roots = {}
+    for p in range(person_count):
+        labels[p] = roots.setdefault(find(p), len(roots))
+    return labels
+
+
+def build_csr(count, keys, values):
+    """
+    Groups `values` by `keys` (dense integers below `count`), returning
+    the offsets and indices arrays of the grouping.
+    """
+    offsets = array("i", [0]) * (count + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", [0]) * len(keys)
+    fill = offsets[:-1]
+    for key, value in zip(keys, values):
+        indices[fill[key]] = value
+        fill[key] += 1
+    return offsets, indices
+
+
+def load_graph(directory, snapshot=True, min_year=None, max_year=None, drop_isolated=False):
+    """
+    Load data from CSV files into a CompactGraph, filtered as
+    `ingest.load_tables` describes.
+
+    If `snapshot` is true, a binary snapshot is written next to the CSV
+    files after parsing them, and memory-mapped instead of parsing on
+    later calls for as long as the CSV files and filters are unchanged.
+    """
+    options = [min_year, max_year, drop_isolated]
+    if snapshot:
+        path = os.path.join(directory, SNAPSHOT_FILE)
+        signature = csv_signature(directory, options)
+        graph = read_snapshot(path, signature)
+        if graph is None:
+            graph = parse_graph(directory, *options)
+            try:
+                write_snapshot(graph, path, signature)
+            except OSError:
+                pass
+        graph.snapshot_path = path
+        graph.signature = signature
+        return graph
+    return parse_graph(directory, *options)
+
+
+def csv_signature(directory, options):
+    """
+    Returns the size and modification time of each CSV file along
+    with the load options, used to tell whether a snapshot is stale.
+    """
+    signature = []
+    for filename in CSV_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        signature.append([filename, stat.st_size, stat.st_mtime_ns])
+    signature.append(options)
+    return signature
+
+
+def write_snapshot(graph, path, signature):
+    """
+    Writes a graph to `path` as a JSON header followed by the raw
+    adjacency arrays and NUL-separated string tables.
+    """
+    sections = []
+    for field in ARRAY_FIELDS:
+        sections.append(getattr(graph, field).tobytes())
+    for field in STRING_FIELDS:
+        sections.append("\0".join(getattr(graph, field)).encode("utf-8"))
+
+    header = {
+        "signature": signature,
+        "byteorder": sys.byteorder,
+        "itemsize": array("i").itemsize,
+        "sizes": [len(section) for section in sections],
+        # Joined tables of no strings and of one empty string look alike
+        "counts": [len(getattr(graph, field)) for field in STRING_FIELDS],
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad the header so the arrays that follow are aligned for casting
+    header_bytes += b" " * (-(len(SNAPSHOT_MAGIC) + 8 + len(header_bytes)) % 8)
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for section in sections:
+            f.write(section)
+    os.replace(temporary, path)
+
+
+def read_snapshot(path, signature):
+    """
+    Memory-maps a snapshot written by `write_snapshot`, returning the
+    graph or None if the snapshot is missing or stale.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            return None
+        header_size = int.from_bytes(f.read(8), "little")
+        try:
+            header = json.loads(f.read(header_size).decode("utf-8"))
+        except ValueError:
+            return None
+        if (header["signature"] != signature or header["byteorder"] != sys.byteorder
+                or header["itemsize"] != array("i").itemsize):
+            return None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(buffer)
+    position = len(SNAPSHOT_MAGIC) + 8 + header_size
+    fields = {}
+    counts = dict(zip(STRING_FIELDS, header["counts"]))
+    for field, size in zip(ARRAY_FIELDS + STRING_FIELDS, header["sizes"]):
+        section = view[position:position + size]
+        if field in ARRAY_FIELDS:
+            fields[field] = section.cast("i")
+        else:
+            fields[field] = str(section, "utf-8").split("\0") if counts[field] else []
+        position += size
+    return CompactGraph(**fields)
+
+
+def parse_graph(directory, min_year=None, max_year=None, drop_isolated=False):
+    """
+    Parse the CSV files of a directory into a CompactGraph.
+    """
+    people, movies = load_tables(directory, min_year, max_year, drop_isolated)
+    person_ids = list(people)
+    person_names = [name for name, _ in people.values()]
+    person_births = [birth for _, birth in people.values()]
+    movie_ids = list(movies)
+    movie_titles = [title for title, _ in movies.values()]
+    movie_years = [year for _, year in movies.values()]
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    del people, movies
+
+    # Load stars as parallel arrays of interned ids
+    star_people, star_movies = array("i"), array("i")
+    for chunk in star_chunks(directory, person_index, movie_index):
+        for person_id, movie_id in chunk:
+            star_people.append(person_index[person_id])
+            star_movies.append(movie_index[movie_id])
+
+    person_offsets, person_movies = build_csr(len(person_ids), star_people, star_movies)
+    movie_offsets, movie_stars = build_csr(len(movie_ids), star_movies, star_people)
+
+    return CompactGraph(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        person_offsets, person_movies, movie_offsets, movie_stars)
@@ -0,0 +1,90 @@
+import csv
+from operator import itemgetter
+
+# Number of rows parsed per chunk
+CHUNK_SIZE = 10000
+
+
+def read_chunks(filename, columns, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of at most `chunk_size` rows from a CSV file,
+    each row a tuple holding only `columns`, in that order.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        getter = itemgetter(*[header.index(column) for column in columns])
+        chunk = []
+        for row in reader:
+            # Skip blank lines, as csv.DictReader does
+            if not row:
+                continue
+            chunk.append(getter(row))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def in_year_range(year, min_year, max_year):
+    """
+    Returns whether a movie year lies in the inclusive range,
+    where a bound of None is unlimited.
+    """
+    if min_year is None and max_year is None:
+        return True
+    if not year.isdigit():
+        return False
+    year = int(year)
+    return (min_year is None or year >= min_year) and (max_year is None or year <= max_year)
+
+
+def load_tables(directory, min_year=None, max_year=None, drop_isolated=False, chunk_size=CHUNK_SIZE):
+    """
+    Returns a dictionary mapping person_ids to (name, birth) and one
+    mapping movie_ids to (title, year), for movies released between
+    `min_year` and `max_year`.
+
+    If `drop_isolated` is true, people and movies without any star
+    credit among the kept data are left out.
+    """
+    movies = {}
+    for chunk in read_chunks(f"{directory}/movies.csv", ["id", "title", "year"], chunk_size):
+        for movie_id, title, year in chunk:
+            if in_year_range(year, min_year, max_year):
+                movies[movie_id] = (title, year)
+
+    credited = None
+    if drop_isolated:
+        credited = set()
+        for chunk in read_chunks(f"{directory}/stars.csv", ["person_id", "movie_id"], chunk_size):
+            for person_id, movie_id in chunk:
+                if movie_id in movies:
+                    credited.add(person_id)
+
+    people = {}
+    for chunk in read_chunks(f"{directory}/people.csv", ["id", "name", "birth"], chunk_size):
+        for person_id, name, birth in chunk:
+            if credited is None or person_id in credited:
+                people[person_id] = (name, birth)
+
+    if drop_isolated:
+        starred = set()
+        for chunk in star_chunks(directory, people, movies, chunk_size):
+            starred.update(movie_id for _, movie_id in chunk)
+        movies = {movie_id: row for movie_id, row in movies.items() if movie_id in starred}
+
+    return people, movies
+
+
+def star_chunks(directory, people, movies, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of (person_id, movie_id) star credits whose person
+    and movie are both among the kept `people` and `movies`.
+    """
+    for chunk in read_chunks(f"{directory}/stars.csv", ["person_id", "movie_id"], chunk_size):
+        yield [
+            (person_id, movie_id) for person_id, movie_id in chunk
+            if person_id in people and movie_id in movies
+        ]
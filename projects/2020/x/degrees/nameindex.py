@@ -0,0 +1,223 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress
+from operator import itemgetter
+
+# Matches a query of the form "Name (birth year)"
+BIRTH_HINT = re.compile(r"^(.*?)\s*\((\d{4})\)$")
+
+# Number of trigram matches re-ranked by edit distance in a fuzzy lookup
+FUZZY_CANDIDATES = 50
+
+# Number of a name's rarest trigrams whose matches are counted in a fuzzy
+# lookup without a distance bound
+FUZZY_TRIGRAMS = 7
+
+# Longest posting list read in a fuzzy lookup, as longer ones say little
+FUZZY_POSTINGS = 10000
+
+
+class NameIndex():
+    """
+    Index over people's names supporting exact, prefix and fuzzy lookup.
+
+    Candidates are ranked by how closely they match, then by how many
+    movies the person is credited in.
+    """
+
+    def __init__(self, person_ids, names, births, credits):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.credits = credits
+
+        self.lowered = [name.lower() for name in names]
+        self.sorted_names = sorted((name, i) for i, name in enumerate(self.lowered))
+        self.trigrams = None
+
+    def trigram_postings(self):
+        """
+        Returns the trigram posting lists, building them on the first
+        fuzzy lookup.
+
+        Posting lists are split by name length, so that a lookup bounded
+        by edit distance only reads names of a possible length.
+        """
+        if self.trigrams is None:
+            self.trigrams = [{} for _ in range(max(map(len, self.lowered), default=0) + 1)]
+            for i, name in enumerate(self.lowered):
+                postings = self.trigrams[len(name)]
+                for trigram in set(trigrams(name)):
+                    postings.setdefault(trigram, []).append(i)
+        return self.trigrams
+
+    def exact(self, name):
+        """
+        Returns the person_ids whose name matches exactly, ignoring case.
+        """
+        return [self.person_ids[i] for i in self.prefix_matches(name, exact=True)]
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns the person_ids whose name starts with `prefix`,
+        most credited first.
+        """
+        matches = self.prefix_matches(prefix)
+        matches.sort(key=lambda i: -self.credits[i])
+        return [self.person_ids[i] for i in matches[:limit]]
+
+    def prefix_matches(self, prefix, exact=False):
+        prefix = prefix.lower()
+        position = bisect_left(self.sorted_names, (prefix, -1))
+        matches = []
+        while position < len(self.sorted_names):
+            lowered, i = self.sorted_names[position]
+            if lowered != prefix and (exact or not lowered.startswith(prefix)):
+                break
+            matches.append(i)
+            position += 1
+        return matches
+
+    def fuzzy(self, name, limit=10, max_distance=None):
+        """
+        Returns (distance, person_id) pairs for the names closest to
+        `name` by edit distance, among those sharing the most trigrams.
+        """
+        return [(distance, self.person_ids[i]) for distance, i in self.fuzzy_matches(name, limit, max_distance)]
+
+    def fuzzy_matches(self, name, limit, max_distance):
+        name = name.lower()
+        by_length = self.trigram_postings()
+        if max_distance is not None:
+            by_length = by_length[max(len(name) - max_distance, 0):len(name) + max_distance + 1]
+        postings = {}
+        for trigram in set(trigrams(name)):
+            lists = [length_postings[trigram] for length_postings in by_length if trigram in length_postings]
+            postings[trigram] = (sum(map(len, lists)), lists)
+
+        # Common trigrams have long posting lists, so only the rarest are
+        # counted. An edit changes at most three trigrams, so a name within
+        # max_distance edits has one of the rarest 3 * max_distance + 1,
+        # unless some are skipped for being longer than FUZZY_POSTINGS.
+        rarest = sorted((trigram for trigram in postings if postings[trigram][0]),
+                        key=lambda trigram: postings[trigram][0])
+        rarest = rarest[:FUZZY_TRIGRAMS if max_distance is None else 3 * max_distance + 1]
+        rarest = [trigram for trigram in rarest if postings[trigram][0] <= FUZZY_POSTINGS] or rarest[:1]
+        overlaps = Counter()
+        for trigram in rarest:
+            for posting in postings[trigram][1]:
+                overlaps.update(posting)
+
+        # Only the FUZZY_CANDIDATES best counts are ranked, so find the
+        # lowest count among them before sorting
+        lowest, kept = 1, 0
+        for count, names in sorted(Counter(overlaps.values()).items(), reverse=True):
+            kept += names
+            if kept >= FUZZY_CANDIDATES:
+                lowest = count
+                break
+        matches = compress(overlaps.items(), map(lowest.__le__, overlaps.values()))
+        matches = sorted(matches, key=itemgetter(1), reverse=True)[:FUZZY_CANDIDATES]
+
+        ranked = []
+        bound = max_distance
+        for i, count in matches:
+            # Each trigram missed needs an edit for every three
+            if bound is not None and (len(rarest) - count + 2) // 3 > bound:
+                break
+            distance = edit_distance(name, self.lowered[i], bound)
+            if bound is None or distance <= bound:
+                ranked.append((distance, -self.credits[i], i))
+                # Once `limit` names are this close, farther ones are not returned
+                if len(ranked) >= limit:
+                    bound = sorted(distance for distance, _, _ in ranked)[limit - 1]
+        ranked.sort()
+        return [(distance, i) for distance, _, i in ranked[:limit]]
+
+    def candidates(self, name, limit=10):
+        """
+        Returns ranked person_ids for a name: exact matches if there are
+        any, otherwise prefix matches, otherwise fuzzy matches.
+        """
+        exact = self.prefix_matches(name, exact=True)
+        if exact:
+            exact.sort(key=lambda i: -self.credits[i])
+            return [self.person_ids[i] for i in exact[:limit]]
+        return self.prefix(name, limit) or [person_id for _, person_id in self.fuzzy(name, limit)]
+
+    def resolve(self, name, birth=None, max_distance=2):
+        """
+        Returns a single person_id for a name without asking the user,
+        or None if nothing matches.
+
+        A trailing "(year)" in the name, or `birth`, prefers people born
+        that year. Exact matches win over fuzzy ones within `max_distance`
+        edits, and ties go to the most credited person.
+        """
+        match = BIRTH_HINT.match(name)
+        if match and birth is None:
+            name, birth = match.group(1), match.group(2)
+
+        matches = self.prefix_matches(name, exact=True)
+        if not matches:
+            # Without a birth year the closest, most credited match wins
+            fuzzy = self.fuzzy_matches(name, FUZZY_CANDIDATES if birth is not None else 1, max_distance)
+            if not fuzzy:
+                return None
+            matches = [i for distance, i in fuzzy if distance == fuzzy[0][0]]
+
+        if birth is not None:
+            born = [i for i in matches if self.births[i] == str(birth)]
+            matches = born or matches
+        return self.person_ids[max(matches, key=lambda i: self.credits[i])]
+
+
+def trigrams(name):
+    """
+    Returns the three-character substrings of a padded name.
+    """
+    padded = f"  {name} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, bound=None):
+    """
+    Returns the Levenshtein distance between two strings, or any value
+    above `bound` once the distance is known to exceed it.
+
+    Uses Myers' bit-parallel algorithm, which keeps a column of the
+    distance table as bit vectors of the shorter string's length.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if bound is not None and len(a) - len(b) > bound:
+        return bound + 1
+    if not b:
+        return len(a)
+
+    # Bit j of matches[c] is set where b[j] is c
+    matches = {}
+    for j, c in enumerate(b):
+        matches[c] = matches.get(c, 0) | (1 << j)
+    mask = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+
+    # Bits of the vertical deltas (+1 and -1) down the current column
+    plus, minus = mask, 0
+    distance = len(b)
+    for c in a:
+        match = matches.get(c, 0)
+        vertical = match | minus
+        diagonal = (((match & plus) + plus) ^ plus) | match
+        horizontal_plus = minus | ~(diagonal | plus)
+        horizontal_minus = plus & diagonal
+        if horizontal_plus & last:
+            distance += 1
+        elif horizontal_minus & last:
+            distance -= 1
+        horizontal_plus = (horizontal_plus << 1) | 1
+        horizontal_minus <<= 1
+        plus = (horizontal_minus | ~(vertical | horizontal_plus)) & mask
+        minus = horizontal_plus & vertical & mask
+    return distance
@@ -0,0 +1,165 @@
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+
+# Frontier levels smaller than this are expanded serially
+PARALLEL_THRESHOLD = 10000
+
+# Shared arrays attached by each worker process of a ParallelBFS pool
+worker_arrays = None
+worker_memory = None
+
+
+class ParallelBFS():
+    """
+    Level-synchronous breadth-first search over a CompactGraph whose
+    adjacency is copied once into shared memory. Each frontier level
+    large enough to be worth it is split across a process pool; the
+    workers read the shared reached-person and seen-movie flags, which
+    only this process writes between levels.
+    """
+
+    def __init__(self, graph, processes=None, threshold=PARALLEL_THRESHOLD):
+        # Workers only see the CSR arrays, so fold in any added credits
+        graph.compact()
+        self.graph = graph
+        self.threshold = threshold
+        self.memory = []
+        self.views = []
+        self.arrays = []
+        for values in [graph.person_offsets, graph.person_movies, graph.movie_offsets, graph.movie_stars]:
+            self.arrays.append(self.share(array("i", values).tobytes(), "i"))
+        self.visited = self.share(bytes(len(graph.person_ids)), "B")
+        self.seen = self.share(bytes(len(graph.movie_ids)), "B")
+
+        segments = [(memory.name, view.nbytes) for memory, view in zip(self.memory, self.views[::2])]
+        self.processes = processes or os.cpu_count()
+        self.pool = Pool(self.processes, initializer=attach_worker, initargs=(segments,))
+
+    def share(self, data, typecode):
+        """
+        Copies `data` into a new shared memory segment and returns
+        a view of it as an array of `typecode` items.
+        """
+        memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        view = memory.buf[:len(data)]
+        view[:] = data
+        self.memory.append(memory)
+        self.views.extend([view, view.cast(typecode)])
+        return self.views[-1]
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        graph = self.graph
+        s = graph.person_index[source]
+        t = graph.person_index[target]
+        if s == t:
+            return graph.self_path(s)
+        if graph.components[s] != graph.components[t]:
+            return None
+
+        parent_people, parent_movies = {s: -1}, {s: -1}
+        seen_movies = []
+        self.visited[s] = 1
+        try:
+            frontier = [s]
+            while frontier and not self.visited[t]:
+                found, scanned = self.expand_level(frontier)
+                for m in scanned:
+                    if not self.seen[m]:
+                        self.seen[m] = 1
+                        seen_movies.append(m)
+
+                # Several workers may reach the same person; the first wins
+                frontier = []
+                for i in range(0, len(found), 3):
+                    q = found[i]
+                    if not self.visited[q]:
+                        self.visited[q] = 1
+                        parent_people[q] = found[i + 1]
+                        parent_movies[q] = found[i + 2]
+                        frontier.append(q)
+        finally:
+            # Only reset the flags this search set
+            for p in parent_people:
+                self.visited[p] = 0
+            for m in seen_movies:
+                self.seen[m] = 0
+
+        return graph.path_in_tree((parent_people, parent_movies), target)
+
+    def expand_level(self, frontier):
+        """
+        Returns the (person, parent, movie) triples for unreached people
+        one step from the frontier, and the movies scanned to find them.
+        """
+        if len(frontier) < self.threshold:
+            return expand(frontier, self.arrays, self.visited, self.seen)
+
+        size = -(-len(frontier) // self.processes)
+        chunks = [array("i", frontier[i:i + size]).tobytes() for i in range(0, len(frontier), size)]
+        found, scanned = array("i"), array("i")
+        for chunk_found, chunk_scanned in self.pool.map(expand_in_worker, chunks):
+            found.frombytes(chunk_found)
+            scanned.frombytes(chunk_scanned)
+        return found, scanned
+
+
+def expand(frontier, arrays, visited, seen):
+    """
+    Expands the people of a frontier, returning a flat array of
+    (person, parent, movie) triples for people not yet visited and
+    an array of the movies scanned.
+    """
+    person_offsets, person_movies, movie_offsets, movie_stars = arrays
+    found, scanned = array("i"), array("i")
+    local_people, local_movies = set(), set()
+    for p in frontier:
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            if seen[m] or m in local_movies:
+                continue
+            local_movies.add(m)
+            scanned.append(m)
+            for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                q = movie_stars[j]
+                if not visited[q] and q not in local_people:
+                    local_people.add(q)
+                    found.extend((q, p, m))
+    return found, scanned
+
+
+def attach_worker(segments):
+    global worker_arrays, worker_memory
+    worker_memory = [shared_memory.SharedMemory(name=name) for name, _ in segments]
+    views = [memory.buf[:size] for memory, (_, size) in zip(worker_memory, segments)]
+    worker_arrays = [view.cast("i") for view in views[:4]] + views[4:]
+
+
+def expand_in_worker(chunk):
+    frontier = array("i")
+    frontier.frombytes(chunk)
+    found, scanned = expand(frontier, worker_arrays[:4], worker_arrays[4], worker_arrays[5])
+    return found.tobytes(), scanned.tobytes()
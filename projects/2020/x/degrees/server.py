@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+from batch import resolve_person
+from util import LRUCache
+
+# Number of (source, target) results kept by the server's cache
+CACHE_SIZE = 100000
+
+
+class DegreesServer():
+    """
+    Serves shortest-path and neighbor queries against a CompactGraph
+    loaded once, speaking one JSON object per line in each direction.
+
+    Requests look like {"op": "path", "source": ..., "target": ...} or
+    {"op": "neighbors", "person": ...}, where people are given by name
+    or IMDB id.
+    """
+
+    def __init__(self, graph, cache_size=CACHE_SIZE):
+        self.graph = graph
+        self.cache = LRUCache(cache_size)
+        # Counts updates, so searches that overlap one don't cache their results
+        self.generation = 0
+
+    def update(self, people=(), movies=(), stars=()):
+        """
+        Adds (person_id, name, birth) people, (movie_id, title, year)
+        movies and (person_id, movie_id) star credits to the graph, and
+        evicts the cached results of the components they touch.
+        """
+        self.generation += 1
+        for person_id, name, birth in people:
+            self.graph.add_person(person_id, name, birth)
+        for movie_id, title, year in movies:
+            self.graph.add_movie(movie_id, title, year)
+        touched = set()
+        for person_id, movie_id in stars:
+            self.graph.add_star(person_id, movie_id)
+            touched.add(person_id)
+
+        # Merged components now share a label, so look them up afterwards
+        affected = {self.graph.component_of(self.graph.person_index[person_id]) for person_id in touched}
+        for source, target in self.cache.keys():
+            if self.graph.component_of(self.graph.person_index[source]) in affected:
+                self.cache.discard((source, target))
+
+    async def answer(self, request):
+        """
+        Returns the response dictionary for a request, running name
+        lookups and searches in a worker thread so other clients keep
+        being served.
+        """
+        loop = asyncio.get_running_loop()
+        op = request.get("op")
+        if op == "path":
+            source = await loop.run_in_executor(None, resolve_person, self.graph, str(request.get("source", "")))
+            target = await loop.run_in_executor(None, resolve_person, self.graph, str(request.get("target", "")))
+            if source is None or target is None:
+                return {"error": "Person not found."}
+            key = (source, target)
+            if key in self.cache:
+                path = self.cache.get(key)
+            else:
+                generation = self.generation
+                path = await loop.run_in_executor(None, self.graph.shortest_path, source, target)
+                if self.generation == generation:
+                    self.cache.put(key, path)
+            return {"source": source, "target": target, "path": path,
+                    "degrees": None if path is None else len(path)}
+        elif op == "neighbors":
+            person = await loop.run_in_executor(None, resolve_person, self.graph, str(request.get("person", "")))
+            if person is None:
+                return {"error": "Person not found."}
+            neighbors = await loop.run_in_executor(None, self.graph.neighbors_for_person, person)
+            return {"person": person, "neighbors": sorted(neighbors)}
+        return {"error": f"Unknown op: {op}"}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be an object")
+                except ValueError as error:
+                    response = {"error": f"Invalid request: {error}"}
+                else:
+                    response = await self.answer(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, address):
+        """
+        Starts listening on `address`, either "host:port" for TCP
+        or the path of a Unix socket, and returns the asyncio server.
+        """
+        host, _, port = address.rpartition(":")
+        if port.isdigit():
+            return await asyncio.start_server(self.handle_client, host or "127.0.0.1", int(port))
+        return await asyncio.start_unix_server(self.handle_client, address)
+
+
+def serve(graph, address, cache_size=CACHE_SIZE):
+    """
+    Serves queries on `address` until interrupted.
+    """
+    async def run():
+        server = await DegreesServer(graph, cache_size).start(address)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
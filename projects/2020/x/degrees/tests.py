@@ -1,7 +1,38 @@
-import unittest
+import asyncio
 import csv
-from degrees import load_data, shortest_path, person_id_for_name
-from util import Node, StackFrontier, QueueFrontier
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import degrees
+from degrees import add_person, add_movie, add_star
+from degrees import movies, load_data, shortest_path, bidirectional_shortest_path, person_id_for_name, neighbors_for_person
+from degrees import costars_for_person, precompute_costars, costars, components, connected
+from degrees import shortest_path_dag, count_paths, top_shortest_paths, sample_shortest_path
+from degrees import astar_shortest_path, build_landmarks, save_landmarks, load_landmarks, within_distance
+from util import Node, StackFrontier, QueueFrontier, SearchStats, LRUCache
+from graph import load_graph, SNAPSHOT_FILE
+from batch import read_queries, run_batch
+from ingest import read_chunks, load_tables
+from nameindex import NameIndex, edit_distance
+from parallel import ParallelBFS
+from benchmark import generate_dataset, run_benchmark, synthetic_name, misspell
+from server import DegreesServer
+
+
+def copy_small(test):
+    """
+    Copies the "small" dataset to a temporary directory that is removed
+    after `test`, returning its path.
+    """
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    for filename in ["people.csv", "movies.csv", "stars.csv"]:
+        shutil.copy(os.path.join("small", filename), directory)
+    return directory
 
 
 class TestShortestPath(unittest.TestCase):
@@ -32,5 +63,605 @@ class TestShortestPath(unittest.TestCase):
         return shortest_path(source, target)
 
 
+class TestBidirectionalShortestPath(unittest.TestCase):
+    def test_find_further_node(self):
+        path = self.get_shortest_path("small", "Kevin Bacon", "Cary Elwes")
+        self.assertEqual(len(path), 3)
+        self.assertEqual(path[-1][1], person_id_for_name("Cary Elwes"))
+
+    def test_path_is_connected(self):
+        path = self.get_shortest_path("small", "Dustin Hoffman", "Robin Wright")
+        source = person_id_for_name("Dustin Hoffman")
+        self.assertEqual(len(path), len(shortest_path(source, person_id_for_name("Robin Wright"))))
+        previous = source
+        for movie_id, person_id in path:
+            self.assertIn((movie_id, person_id), neighbors_for_person(previous))
+            previous = person_id
+
+    def test_find_same_actor(self):
+        self.assertEqual(len(self.get_shortest_path(
+            "small", "Kevin Bacon", "Kevin Bacon")), 1)
+
+    def test_find_neighbor_node(self):
+        self.assertEqual(len(self.get_shortest_path(
+            "small", "Kevin Bacon", "Tom Cruise")), 1)
+
+    def test_no_path(self):
+        self.assertEqual(self.get_shortest_path(
+            "small", "Kevin Bacon", "Emma Watson"), None)
+
+    def get_shortest_path(self, directory, sourceName, targetName):
+        load_data(directory)
+        source = person_id_for_name(sourceName)
+        target = person_id_for_name(targetName)
+        return bidirectional_shortest_path(source, target)
+
+
+class TestAllShortestPaths(unittest.TestCase):
+    def setUp(self):
+        load_data("small")
+
+    def assertConnected(self, source, path):
+        previous = source
+        for movie_id, person_id in path:
+            self.assertIn((movie_id, person_id), neighbors_for_person(previous))
+            previous = person_id
+
+    def test_dag_paths_are_shortest(self):
+        dag = shortest_path_dag("102", "144")
+        paths = top_shortest_paths(dag, "144", 100)
+        self.assertEqual(len(paths), count_paths(dag, "144"))
+        self.assertEqual(len(set(map(tuple, paths))), len(paths))
+        for path in paths:
+            self.assertEqual(len(path), 3)
+            self.assertEqual(path[-1][1], "144")
+            self.assertConnected("102", path)
+
+    def test_top_paths_ordered_by_score(self):
+        dag = shortest_path_dag("102", "144")
+        paths = top_shortest_paths(dag, "144", 100)
+        totals = [sum(int(movies[movie_id]["year"]) for movie_id, _ in path) for path in paths]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        self.assertEqual(top_shortest_paths(dag, "144", 1), paths[:1])
+
+    def test_sample_shortest_path(self):
+        dag = shortest_path_dag("163", "705")
+        path = sample_shortest_path(dag, "705")
+        self.assertEqual(len(path), len(shortest_path("163", "705")))
+        self.assertConnected("163", path)
+
+    def test_self_path(self):
+        dag = shortest_path_dag("102", "102")
+        paths = top_shortest_paths(dag, "102", 100)
+        self.assertIn(shortest_path("102", "102"), paths)
+        self.assertEqual(len(paths), count_paths(dag, "102"))
+        for path in paths:
+            self.assertEqual(len(path), 1)
+            self.assertConnected("102", path)
+        self.assertIn(sample_shortest_path(dag, "102"), paths)
+
+    def test_no_path(self):
+        self.assertIsNone(shortest_path_dag("102", "914612"))
+
+
+class TestCostars(unittest.TestCase):
+    def setUp(self):
+        load_data("small")
+
+    def tearDown(self):
+        costars.clear()
+
+    def test_costars_deduplicate_neighbors(self):
+        for person_id in ["102", "158", "914612"]:
+            neighbors = neighbors_for_person(person_id)
+            person_costars = costars_for_person(person_id)
+            self.assertEqual(set(person_costars), {costar_id for _, costar_id in neighbors})
+            for costar_id, movie_id in person_costars.items():
+                self.assertIn((movie_id, costar_id), neighbors)
+
+    def test_precomputed_costars(self):
+        memoized = {person_id: dict(costars_for_person(person_id)) for person_id in ["102", "158"]}
+        precompute_costars()
+        self.assertEqual(len(costars), 16)
+        for person_id, person_costars in memoized.items():
+            self.assertEqual(set(costars_for_person(person_id)), set(person_costars))
+        self.assertEqual(len(shortest_path("102", "144")), 3)
+
+
+class TestComponents(unittest.TestCase):
+    def test_components(self):
+        load_data("small")
+        self.assertTrue(connected("102", "144"))
+        self.assertFalse(connected("102", "914612"))
+        self.assertEqual(len(set(components.values())), 2)
+
+    def test_graph_components(self):
+        graph = load_graph("small", snapshot=False)
+        self.assertTrue(graph.connected("102", "144"))
+        self.assertFalse(graph.connected("102", "914612"))
+        self.assertEqual(sorted(set(graph.components)), [0, 1])
+
+
+class TestLandmarks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_data("small")
+        cls.landmarks = build_landmarks(count=2)
+
+    def test_astar_matches_breadth_first(self):
+        for source in ["102", "158", "163", "914612"]:
+            for target in ["129", "144", "1597", "914612"]:
+                expected = shortest_path(source, target)
+                path = astar_shortest_path(source, target, self.landmarks)
+                if expected is None:
+                    self.assertIsNone(path)
+                else:
+                    self.assertEqual(len(path), len(expected))
+                    self.assertEqual(path[-1][1], target)
+
+    def test_within_distance(self):
+        self.assertFalse(within_distance(self.landmarks, "102", "914612", 100))
+        self.assertTrue(within_distance(self.landmarks, "102", "144", 6))
+        self.assertFalse(within_distance(self.landmarks, "102", "144", 0))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "landmarks.json")
+            save_landmarks(self.landmarks, filename)
+            self.assertEqual(load_landmarks(filename), self.landmarks)
+
+
+class TestCompactGraph(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_data("small")
+        cls.graph = load_graph("small", snapshot=False)
+
+    def test_person_ids_for_name(self):
+        self.assertEqual(self.graph.person_ids_for_name("kevin bacon"), ["102"])
+        self.assertEqual(self.graph.person_ids_for_name("Nobody"), [])
+
+    def test_exact_lookup_skips_name_index(self):
+        graph = load_graph("small", snapshot=False)
+        self.assertEqual(graph.person_ids_for_name("Tom Hanks"), ["158"])
+        self.assertIsNone(graph.name_index)
+        graph.add_person("1", "Tom Hanks", "2000")
+        self.assertEqual(graph.person_ids_for_name("tom hanks"), ["158", "1"])
+
+    def test_neighbors_match_dictionaries(self):
+        for person_id in self.graph.person_ids:
+            self.assertEqual(self.graph.neighbors_for_person(person_id), neighbors_for_person(person_id))
+
+    def test_path_lengths_match_dictionaries(self):
+        for source in self.graph.person_ids:
+            for target in self.graph.person_ids:
+                expected = shortest_path(source, target)
+                path = self.graph.shortest_path(source, target)
+                if expected is None:
+                    self.assertIsNone(path)
+                else:
+                    self.assertEqual(len(path), len(expected))
+                    self.assertEqual(path[-1][1], target)
+
+    def test_path_is_connected(self):
+        path = self.graph.shortest_path("102", "705")
+        previous = "102"
+        for movie_id, person_id in path:
+            self.assertIn((movie_id, person_id), neighbors_for_person(previous))
+            previous = person_id
+
+
+class TestParallelBFS(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = load_graph("small", snapshot=False)
+
+    def test_matches_serial_search(self):
+        for threshold in [0, 1000]:
+            with ParallelBFS(self.graph, processes=2, threshold=threshold) as search:
+                for source in self.graph.person_ids:
+                    for target in self.graph.person_ids:
+                        expected = self.graph.shortest_path(source, target)
+                        path = search.shortest_path(source, target)
+                        if expected is None:
+                            self.assertIsNone(path)
+                        else:
+                            self.assertEqual(len(path), len(expected))
+                            self.assertEqual(path[-1][1], target)
+
+    def test_flags_reset_between_searches(self):
+        with ParallelBFS(self.graph, processes=2, threshold=0) as search:
+            search.shortest_path("102", "144")
+            self.assertFalse(any(search.visited))
+            self.assertFalse(any(search.seen))
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = load_graph("small", snapshot=False)
+
+    def test_answer(self):
+        server = DegreesServer(self.graph)
+        response = asyncio.run(server.answer({"op": "path", "source": "Kevin Bacon", "target": "144"}))
+        self.assertEqual(response["degrees"], 3)
+        self.assertIn(("102", "144"), server.cache)
+        response = asyncio.run(server.answer({"op": "neighbors", "person": "102"}))
+        self.assertEqual(len(response["neighbors"]), len(self.graph.neighbors_for_person("102")))
+        response = asyncio.run(server.answer({"op": "path", "source": "Nobody At All", "target": "144"}))
+        self.assertEqual(response["error"], "Person not found.")
+        self.assertIn("error", asyncio.run(server.answer({"op": "unknown"})))
+
+    def test_update_evicts_affected_components(self):
+        graph = load_graph("small", snapshot=False)
+        server = DegreesServer(graph)
+        asyncio.run(server.answer({"op": "path", "source": "102", "target": "914612"}))
+        asyncio.run(server.answer({"op": "path", "source": "102", "target": "129"}))
+        asyncio.run(server.answer({"op": "path", "source": "914612", "target": "914612"}))
+        server.update(people=[("1", "New Person", "2000")], stars=[("1", "112384")])
+        self.assertNotIn(("102", "914612"), server.cache)
+        self.assertNotIn(("102", "129"), server.cache)
+        self.assertIn(("914612", "914612"), server.cache)
+
+    def test_update_during_search_not_cached(self):
+        graph = load_graph("small", snapshot=False)
+        server = DegreesServer(graph)
+        search = graph.shortest_path
+
+        def shortest_path(source, target):
+            server.update(people=[("1", "New Person", "2000")])
+            return search(source, target)
+
+        graph.shortest_path = shortest_path
+        response = asyncio.run(server.answer({"op": "path", "source": "102", "target": "144"}))
+        self.assertEqual(response["degrees"], 3)
+        self.assertNotIn(("102", "144"), server.cache)
+
+    def test_round_trip(self):
+        async def query():
+            server = await DegreesServer(self.graph).start("127.0.0.1:0")
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b'{"op": "path", "source": "102", "target": "914612"}\nnot json\n')
+                responses = [json.loads(await reader.readline()) for _ in range(2)]
+                writer.close()
+                return responses
+        responses = asyncio.run(query())
+        self.assertIsNone(responses[0]["path"])
+        self.assertIn("Invalid request", responses[1]["error"])
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = copy_small(self)
+
+    def test_snapshot_written_and_mapped(self):
+        parsed = load_graph(self.directory)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT_FILE)))
+        mapped = load_graph(self.directory)
+        self.assertIsInstance(mapped.person_movies, memoryview)
+        self.assertEqual(list(mapped.components), list(parsed.components))
+        self.assertEqual(mapped.person_ids, parsed.person_ids)
+        self.assertEqual(mapped.movie("104257"), parsed.movie("104257"))
+        self.assertEqual(list(mapped.movie_stars), list(parsed.movie_stars))
+        self.assertEqual(len(mapped.shortest_path("102", "144")), 3)
+
+    def test_snapshot_invalidated_by_csv_change(self):
+        load_graph(self.directory)
+        with open(os.path.join(self.directory, "people.csv"), "a", encoding="utf-8") as f:
+            f.write('999,"New Person",2000\n')
+        graph = load_graph(self.directory)
+        self.assertNotIsInstance(graph.person_movies, memoryview)
+        self.assertEqual(graph.person_ids_for_name("New Person"), ["999"])
+
+    def test_snapshot_keeps_single_empty_strings(self):
+        with open(os.path.join(self.directory, "people.csv"), "w", encoding="utf-8") as f:
+            f.write('id,name,birth\n1,"Only Person",\n')
+        with open(os.path.join(self.directory, "movies.csv"), "w", encoding="utf-8") as f:
+            f.write('id,title,year\n10,"Only Movie",\n')
+        with open(os.path.join(self.directory, "stars.csv"), "w", encoding="utf-8") as f:
+            f.write("person_id,movie_id\n1,10\n")
+        parsed = load_graph(self.directory)
+        mapped = load_graph(self.directory)
+        self.assertIsInstance(mapped.person_movies, memoryview)
+        self.assertEqual(mapped.person_births, [""])
+        self.assertEqual(mapped.movie_years, parsed.movie_years)
+        self.assertEqual(mapped.shortest_path("1", "1"), parsed.shortest_path("1", "1"))
+
+
+class TestBatch(unittest.TestCase):
+    QUERIES = "Kevin Bacon\tCary Elwes\n# comment\nKevin Bacon\t129\n102\tEmma Watson\nKevin Bacon\tNobody\nTom Hanks\tKevin Bacon\n"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = load_graph("small", snapshot=False)
+
+    def test_read_queries(self):
+        queries = read_queries(io.StringIO(self.QUERIES))
+        self.assertEqual(len(queries), 5)
+        self.assertEqual(queries[1], ("Kevin Bacon", "129"))
+
+    def test_read_queries_keeps_quotes(self):
+        queries = read_queries(io.StringIO('"Weird Al" Yankovic\tKevin Bacon\n'))
+        self.assertEqual(queries, [('"Weird Al" Yankovic', "Kevin Bacon")])
+
+    def test_malformed_line_reported(self):
+        queries = read_queries(io.StringIO("Kevin Bacon\nKevin Bacon\tTom Hanks\n"))
+        results = run_batch(self.graph, queries)
+        self.assertIn("error", results[0])
+        self.assertEqual(results[0]["source"], "Kevin Bacon")
+        self.assertEqual(results[1]["degrees"], 1)
+
+    def test_run_batch(self):
+        results = run_batch(self.graph, read_queries(io.StringIO(self.QUERIES)))
+        self.assertEqual([result.get("degrees") for result in results], [3, 1, None, None, 1])
+        self.assertIsNone(results[2]["path"])
+        self.assertEqual(results[3]["error"], "Person not found.")
+        self.assertEqual(results[0]["path"][-1][1], "144")
+        self.assertEqual((results[0]["source_id"], results[0]["target_id"]), ("102", "144"))
+        self.assertIsNone(results[3]["target_id"])
+
+    def test_run_batch_in_pool(self):
+        queries = read_queries(io.StringIO(self.QUERIES))
+        serial = run_batch(self.graph, queries)
+        parallel = run_batch(self.graph, queries, "small", processes=2)
+        self.assertEqual([r.get("degrees") for r in parallel], [r.get("degrees") for r in serial])
+
+    def test_pool_needs_directory(self):
+        with self.assertRaises(ValueError):
+            run_batch(self.graph, read_queries(io.StringIO(self.QUERIES)), processes=2)
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(
+            ["1", "2", "3", "4", "5"],
+            ["Tom Hanks", "Tom Cruise", "Tom Hanks", "Tim Hanks", "Sally Field"],
+            ["1956", "1962", "1990", "1970", "1946"],
+            [40, 30, 2, 5, 20])
+
+    def test_exact(self):
+        self.assertEqual(sorted(self.index.exact("tom hanks")), ["1", "3"])
+        self.assertEqual(self.index.exact("Tom"), [])
+        self.assertEqual(self.index.resolve("Tom Hanks"), "1")
+        self.assertIsNone(self.index.trigrams)
+
+    def test_prefix(self):
+        self.assertEqual(self.index.prefix("tom"), ["1", "2", "3"])
+        self.assertEqual(self.index.prefix("tom", limit=1), ["1"])
+
+    def test_fuzzy(self):
+        self.assertEqual(self.index.fuzzy("Tom Hnaks", limit=3), [(2, "1"), (2, "3"), (3, "4")])
+        self.assertEqual(self.index.candidates("Salli Field"), ["5"])
+
+    def test_resolve(self):
+        self.assertEqual(self.index.resolve("Tom Hanks"), "1")
+        self.assertEqual(self.index.resolve("Tom Hanks (1990)"), "3")
+        self.assertEqual(self.index.resolve("Tom Hanks", birth=1990), "3")
+        self.assertEqual(self.index.resolve("Tom Hankz"), "1")
+        self.assertIsNone(self.index.resolve("Nobody At All"))
+
+    def test_fuzzy_finds_closest_names(self):
+        rng = random.Random(0)
+        names = [synthetic_name(rng) for _ in range(1000)]
+        index = NameIndex([str(i) for i in range(len(names))], names, [""] * len(names), [0] * len(names))
+        for name in names[:50]:
+            query = misspell(name, rng).lower()
+            closest = min(edit_distance(query, other.lower(), 2) for other in names)
+            matches = index.fuzzy_matches(query, 1, 2)
+            if closest <= 2:
+                self.assertEqual(closest, matches[0][0])
+            else:
+                self.assertEqual([], matches)
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertGreater(edit_distance("kitten", "sitting", 2), 2)
+        self.assertGreater(edit_distance("kitten", "kit", 1), 1)
+
+    def test_person_id_for_name_non_interactive(self):
+        load_data("small")
+        self.assertEqual(person_id_for_name("Kevin Bacn", interactive=False), "102")
+        graph = load_graph("small", snapshot=False)
+        self.assertEqual(person_id_for_name("kevin bacon", graph, interactive=False), "102")
+
+
+class TestIngest(unittest.TestCase):
+    def test_read_chunks(self):
+        chunks = list(read_chunks("small/people.csv", ["name", "id"], chunk_size=5))
+        self.assertEqual([len(chunk) for chunk in chunks], [5, 5, 5, 1])
+        self.assertEqual(chunks[0][0], ("Kevin Bacon", "102"))
+
+    def test_blank_lines_skipped(self):
+        directory = copy_small(self)
+        with open(os.path.join(directory, "stars.csv"), "a", encoding="utf-8") as f:
+            f.write("\n\n")
+        people, movies = load_tables(directory)
+        self.assertEqual(len(people), 16)
+        self.assertIsNotNone(load_graph(directory, snapshot=False).shortest_path("102", "144"))
+
+    def test_drop_isolated(self):
+        people, movies = load_tables("small")
+        self.assertIn("914612", people)
+        people, movies = load_tables("small", drop_isolated=True)
+        self.assertNotIn("914612", people)
+        self.assertEqual(len(people), 15)
+
+    def test_year_range(self):
+        people, movies = load_tables("small", min_year=1990, max_year=1995, drop_isolated=True)
+        self.assertEqual(sorted(year for _, year in movies.values()), ["1992", "1994", "1995"])
+        self.assertIn("705", people)
+        self.assertNotIn("144", people)
+
+    def test_filtered_graph(self):
+        graph = load_graph("small", snapshot=False, max_year=1990)
+        self.assertIsNone(graph.shortest_path("102", "144"))
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        for table in [degrees.names, degrees.people, degrees.movies]:
+            table.clear()
+        load_data("small")
+
+    def test_generate_dataset(self):
+        generate_dataset(self.directory, people=200, movies=100, seed=1)
+        people, movies = load_tables(self.directory)
+        self.assertEqual(len(people), 200)
+        self.assertEqual(len(movies), 100)
+        with open(os.path.join(self.directory, "stars.csv"), encoding="utf-8") as f:
+            self.assertGreaterEqual(len(f.readlines()) - 1, 100)
+
+    def test_run_benchmark(self):
+        generate_dataset(self.directory, people=500, movies=300, seed=1)
+        report = run_benchmark(self.directory, queries=30)
+        self.assertGreater(report["load_data_seconds"], 0)
+        self.assertGreater(report["shortest_path_expanded"], 0)
+        self.assertGreater(report["graph_shortest_path_expanded"], 0)
+        self.assertGreater(report["resolve_fuzzy_per_second"], 0)
+        self.assertGreater(report["resolve_fuzzy_accuracy"], 0.5)
+
+
+class TestSearchStats(unittest.TestCase):
+    def setUp(self):
+        load_data("small")
+
+    def test_shortest_path_stats(self):
+        levels = []
+        stats = SearchStats(callback=levels.append)
+        path = shortest_path("102", "144", stats)
+        self.assertEqual(len(path), 3)
+        self.assertEqual(stats.outcome, "found")
+        self.assertEqual(stats.levels, levels)
+        self.assertEqual([level["level"] for level in levels], [1, 2])
+        self.assertEqual(stats.expanded, sum(level["expanded"] for level in levels))
+        self.assertGreaterEqual(stats.frontier_peak, max(level["frontier"] for level in levels))
+        self.assertGreaterEqual(stats.seconds, 0)
+
+    def test_not_connected(self):
+        stats = SearchStats()
+        self.assertIsNone(bidirectional_shortest_path("102", "914612", stats))
+        self.assertEqual(stats.outcome, "not connected")
+        self.assertEqual(stats.expanded, 0)
+
+    def test_bidirectional_and_graph_stats(self):
+        stats = SearchStats()
+        bidirectional_shortest_path("102", "144", stats)
+        self.assertEqual(stats.outcome, "found")
+        self.assertEqual({level["side"] for level in stats.levels}, {"forward", "backward"})
+
+        stats = SearchStats()
+        load_graph("small", snapshot=False).shortest_path("102", "144", stats)
+        self.assertEqual(stats.outcome, "found")
+        self.assertGreater(stats.expanded, 0)
+
+
+class TestUpdates(unittest.TestCase):
+    def setUp(self):
+        load_data("small")
+
+    def tearDown(self):
+        for table in [degrees.names, degrees.people, degrees.movies]:
+            table.clear()
+        load_data("small")
+
+    def test_add_star_connects_components(self):
+        self.assertIsNone(shortest_path("102", "914612"))
+        costars_for_person("102")
+        add_movie("1", "New Movie", "2020")
+        add_star("914612", "1")
+        add_star("129", "1")
+        self.assertTrue(connected("102", "914612"))
+        self.assertEqual(len(shortest_path("102", "914612")), 2)
+        self.assertIn("914612", costars_for_person("129"))
+
+    def test_add_person(self):
+        add_person("1", "New Person", "2000")
+        self.assertEqual(person_id_for_name("New Person"), "1")
+        self.assertFalse(connected("1", "102"))
+        add_star("1", "112384")
+        self.assertEqual(len(bidirectional_shortest_path("1", "144")), 3)
+
+    def test_graph_updates(self):
+        graph = load_graph("small", snapshot=False)
+        graph.add_person("1", "New Person", "2000")
+        graph.add_movie("2", "New Movie", "2020")
+        self.assertFalse(graph.connected("1", "102"))
+        graph.add_star("1", "2")
+        graph.add_star("914612", "2")
+        graph.add_star("1", "112384")
+        self.assertTrue(graph.connected("914612", "102"))
+        self.assertEqual(len(graph.shortest_path("914612", "144")), 4)
+        self.assertEqual(graph.person_ids_for_name("new person"), ["1"])
+        self.assertIn(("2", "1"), graph.neighbors_for_person("914612"))
+
+        graph.compact()
+        self.assertEqual(graph.added_movies, {})
+        self.assertEqual(len(graph.shortest_path("914612", "144")), 4)
+        self.assertTrue(graph.connected("914612", "102"))
+
+    def test_graph_snapshot_saved(self):
+        directory = copy_small(self)
+        graph = load_graph(directory)
+        graph = load_graph(directory)
+        graph.add_star("914612", "112384")
+        graph.save_snapshot()
+        reloaded = load_graph(directory)
+        self.assertIsInstance(reloaded.person_movies, memoryview)
+        self.assertEqual(len(reloaded.shortest_path("914612", "144")), 3)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+        cache.discard("a")
+        self.assertEqual(cache.keys(), ["c"])
+
+
+class TestFrontier(unittest.TestCase):
+    def test_stack_frontier_order(self):
+        frontier = StackFrontier()
+        for state in ["a", "b", "c"]:
+            frontier.add(Node(state, None, None))
+        self.assertEqual([frontier.remove().state for _ in range(3)], ["c", "b", "a"])
+        self.assertTrue(frontier.empty())
+
+    def test_queue_frontier_order(self):
+        frontier = QueueFrontier()
+        for state in ["a", "b", "c"]:
+            frontier.add(Node(state, None, None))
+        self.assertEqual([frontier.remove().state for _ in range(3)], ["a", "b", "c"])
+        self.assertTrue(frontier.empty())
+
+    def test_contains_state_tracks_removals(self):
+        frontier = QueueFrontier()
+        frontier.add(Node("a", None, None))
+        frontier.add(Node("a", None, None))
+        frontier.add(Node("b", None, None))
+        frontier.remove()
+        self.assertTrue(frontier.contains_state("a"))
+        frontier.remove()
+        self.assertFalse(frontier.contains_state("a"))
+        self.assertTrue(frontier.contains_state("b"))
+
+    def test_remove_from_empty_frontier(self):
+        with self.assertRaises(Exception):
+            StackFrontier().remove()
+
+
 if __name__ == '__main__':
     unittest.main()
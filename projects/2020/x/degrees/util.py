@@ -1,19 +1,29 @@
+import heapq
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
         self.action = action
+        self.depth = 0 if parent is None else parent.depth + 1
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Counts the nodes held for each state, so lookups are O(1)
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +32,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
 
+    def forget(self, node):
+        count = self.states[node.state] - 1
+        if count == 0:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +50,131 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
+
+
+class PriorityFrontier():
+    def __init__(self):
+        self.frontier = []
+        # Breaks priority ties in insertion order
+        self.counter = 0
+
+    def add(self, node, priority):
+        heapq.heappush(self.frontier, (priority, self.counter, node))
+        self.counter += 1
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return heapq.heappop(self.frontier)[2]
+
+
+class LRUCache():
+    """
+    Least recently used cache with bounded size.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self.entries:
+            return default
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def keys(self):
+        return list(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SearchStats():
+    """
+    Counters describing one search, filled in by the search functions
+    that accept a `stats` argument.
+
+    `levels` holds one dictionary per frontier level expanded, with the
+    level, side, people expanded, frontier size, seconds taken and, if
+    tracemalloc is tracing, the memory allocated at the end of the level.
+    If given, `callback` is called with each level's dictionary as it ends.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.expanded = 0
+        self.frontier_peak = 0
+        self.levels = []
+        self.outcome = None
+        self.seconds = 0.0
+        self.started = None
+        self.level_started = None
+        self.current = None
+
+    def start(self):
+        self.started = self.level_started = time.perf_counter()
+
+    def expand(self, level, frontier_size, count=1, side="forward"):
+        """
+        Records `count` people expanded at a level, with `frontier_size`
+        people waiting in the frontier.
+        """
+        if self.current is not None and (self.current["level"], self.current["side"]) != (level, side):
+            self.end_level()
+        if self.current is None:
+            self.current = {"level": level, "side": side, "expanded": 0, "frontier": frontier_size}
+        self.current["expanded"] += count
+        self.expanded += count
+        self.frontier_peak = max(self.frontier_peak, frontier_size)
+
+    def end_level(self):
+        now = time.perf_counter()
+        self.current["seconds"] = now - self.level_started
+        self.current["memory"] = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.levels.append(self.current)
+        self.level_started = now
+        level, self.current = self.current, None
+        if self.callback is not None:
+            self.callback(level)
+
+    def finish(self, outcome):
+        """
+        Ends the search with an outcome of "found", "not connected" if
+        the people are in different components, or "exhausted".
+        """
+        if self.current is not None:
+            self.end_level()
+        self.outcome = outcome
+        self.seconds = time.perf_counter() - self.started
+
+
+def finish_search(stats, path, outcome):
+    """
+    Records a search's outcome in `stats`, if given, and returns `path`.
+    """
+    if stats is not None:
+        stats.finish(outcome)
+    return path
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+from array import array
+from functools import partial
+from multiprocessing import Pool
+
+# Characters read from an HTML file at a time
+CHUNK_SIZE = 65536
+
+# Directories with fewer pages than this are crawled without a process pool
+PARALLEL_THRESHOLD = 256
+
+# Name of the link cache kept in a corpus directory
+CACHE_FILE = "pagerank.cache"
+CACHE_VERSION = 1
+
+# Same link pattern as `pagerank.crawl`
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Matches the start of a link tag cut off by the end of the text read so far
+PARTIAL_LINK = re.compile(r"<(?:a(?:\s[^>]*?(?:href=\"[^\"]*)?)?)?\Z")
+
+
+class LinkExtractor():
+    """
+    Finds the links in HTML text fed to it one chunk at a time. A tag
+    cut off at the end of a chunk is kept and completed by the next one.
+    """
+
+    def __init__(self):
+        self.tail = ""
+        self.links = set()
+
+    def feed(self, text):
+        text = self.tail + text
+        end = 0
+        for match in LINK.finditer(text):
+            self.links.add(match.group(1))
+            end = match.end()
+        partial = PARTIAL_LINK.search(text, end)
+        self.tail = text[partial.start():] if partial else ""
+
+    def close(self):
+        """
+        Returns the set of links found.
+        """
+        self.tail = ""
+        return self.links
+
+
+class LinkCache():
+    """
+    Links extracted from each page of a corpus, keyed by file name and
+    stored with the file's modification time and size, so that a
+    recrawl only parses files that changed. Also holds the ranks of the
+    last run, to warm-start the next iteration.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.ranks = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns the cache stored at `path`, or an empty one if there
+        is none or it cannot be read.
+        """
+        cache = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                cache.files = data["files"]
+                cache.ranks = data["ranks"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cache
+
+    def save(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.files, "ranks": self.ranks}, f)
+        os.replace(temporary, self.path)
+
+    def lookup(self, page, stat):
+        """
+        Returns the cached links of a page if its file is unchanged,
+        otherwise None.
+        """
+        entry = self.files.get(page)
+        if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        return set(entry["links"])
+
+    def store(self, page, stat, links):
+        self.files[page] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "links": sorted(links)}
+
+
+def extract_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the set of links in an HTML file, reading it in chunks.
+    """
+    extractor = LinkExtractor()
+    with open(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            extractor.feed(chunk)
+    return extractor.close()
+
+
+def crawl_edges(directory, processes=None, chunk_size=CHUNK_SIZE, cache=None):
+    """
+    Parses a directory of HTML pages, extracting links in a pool of
+    `processes` worker processes.
+
+    Returns the sorted list of pages and an edge list of two arrays,
+    `sources` and `targets`, where edge `k` is a link from page
+    `sources[k]` to page `targets[k]`. As in `pagerank.crawl`, links to
+    the page itself or to pages outside the corpus are dropped.
+
+    With a LinkCache, only files whose modification time or size
+    changed are parsed, and the cache is updated to match the directory.
+    """
+    pages = sorted(filename for filename in os.listdir(directory) if filename.endswith(".html"))
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+
+    links = [None] * len(pages)
+    if cache is not None:
+        stats = [os.stat(path) for path in paths]
+        links = [cache.lookup(page, stat) for page, stat in zip(pages, stats)]
+    changed = [i for i in range(len(pages)) if links[i] is None]
+
+    for i, page_links in zip(changed, extract_all([paths[i] for i in changed], processes, chunk_size)):
+        links[i] = page_links
+
+    if cache is not None:
+        for i in changed:
+            cache.store(pages[i], stats[i], links[i])
+        for page in set(cache.files) - set(index):
+            del cache.files[page]
+
+    sources, targets = edge_list(index, links)
+    return pages, sources, targets
+
+
+def stream_edges(directory, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Returns the sorted list of pages of a directory and a generator of
+    the (source, target) edges that `crawl_edges` would list, in the
+    same order. Pages are parsed as the generator is consumed, so only
+    the links of the pages being parsed are held in memory.
+    """
+    pages = sorted(filename for filename in os.listdir(directory) if filename.endswith(".html"))
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+    return pages, link_edges(index, extract_all(paths, processes, chunk_size))
+
+
+def extract_all(paths, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the set of links in each of a list of HTML files, in order,
+    extracting them in a pool of `processes` worker processes.
+    """
+    extract = partial(extract_links, chunk_size=chunk_size)
+    if processes == 1 or len(paths) < PARALLEL_THRESHOLD:
+        for path in paths:
+            yield extract(path)
+    else:
+        with Pool(processes) as pool:
+            # Several files per task keeps the pool's overhead small
+            batch = max(1, len(paths) // (4 * (processes or os.cpu_count())))
+            yield from pool.imap(extract, paths, batch)
+
+
+def link_edges(index, results):
+    for source, links in enumerate(results):
+        for link in sorted(links):
+            target = index.get(link)
+            if target is not None and target != source:
+                yield source, target
+
+
+def edge_list(index, results):
+    sources, targets = array("i"), array("i")
+    for source, target in link_edges(index, results):
+        sources.append(source)
+        targets.append(target)
+    return sources, targets
+
+
+def edges_to_corpus(pages, sources, targets):
+    """
+    Returns the corpus dictionary of an edge list, as `pagerank.crawl`
+    would.
+    """
+    corpus = {page: set() for page in pages}
+    for source, target in zip(sources, targets):
+        corpus[pages[source]].add(pages[target])
+    return corpus
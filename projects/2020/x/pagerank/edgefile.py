@@ -0,0 +1,179 @@
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+
+from linkgraph import TOLERANCE, MAX_ITERATIONS
+
+# Edges sorted in memory at a time while building an edge file
+RUN_SIZE = 1000000
+
+# Edges or pages processed at a time while iterating over mapped files
+BLOCK_SIZE = 65536
+
+# Files making up an on-disk link graph
+EDGES_FILE = "edges.bin"
+DEGREES_FILE = "degrees.bin"
+RANKS_FILE = "ranks.bin"
+NEXT_FILE = "next.bin"
+SHARES_FILE = "shares.bin"
+
+
+def write_edge_file(directory, n, edges, run_size=RUN_SIZE):
+    """
+    Writes the link graph of `n` pages given by an iterable of
+    (source, target) edges to `directory`, holding at most `run_size`
+    edges in memory.
+
+    Edges are sorted by target with an external merge sort: sorted runs
+    are written to temporary files and then merged into EDGES_FILE as
+    (target, source) pairs of ints. Each page's number of links is
+    written to DEGREES_FILE.
+    """
+    os.makedirs(directory, exist_ok=True)
+    degrees = array("i", [0]) * n
+    runs = []
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        # Encoding each edge as one int sorts it by target, then source
+        run = array("q")
+        for source, target in edges:
+            degrees[source] += 1
+            run.append(target * n + source)
+            if len(run) == run_size:
+                runs.append(write_run(scratch, len(runs), run))
+                run = array("q")
+        if run:
+            runs.append(write_run(scratch, len(runs), run))
+
+        with open(os.path.join(directory, EDGES_FILE), "wb") as f:
+            block = array("i")
+            for key in heapq.merge(*[read_run(path) for path in runs]):
+                block.extend(divmod(key, n))
+                if len(block) >= 2 * BLOCK_SIZE:
+                    block.tofile(f)
+                    block = array("i")
+            block.tofile(f)
+
+    with open(os.path.join(directory, DEGREES_FILE), "wb") as f:
+        degrees.tofile(f)
+
+
+def write_run(directory, number, run):
+    path = os.path.join(directory, f"run{number}.bin")
+    with open(path, "wb") as f:
+        array("q", sorted(run)).tofile(f)
+    return path
+
+
+def read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            block = array("q")
+            block.frombytes(f.read(BLOCK_SIZE * block.itemsize))
+            if not block:
+                break
+            yield from block
+
+
+class MappedArray():
+    """
+    Array of `typecode` items stored in a file and accessed through
+    `mmap`, usable as a context manager that closes the mapping.
+    """
+
+    def __init__(self, path, typecode, length=None):
+        if length is not None:
+            with open(path, "wb") as f:
+                f.truncate(length * array(typecode).itemsize)
+        self.file = open(path, "r+b")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), size) if size else None
+        self.view = memoryview(self.map).cast(typecode) if size else memoryview(array(typecode))
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self.view
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iterate_edge_file(directory, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                      block_size=BLOCK_SIZE):
+    """
+    Runs power iteration on the link graph written to `directory` by
+    `write_edge_file`, keeping the rank vectors in memory-mapped files
+    and reading edges and pages `block_size` at a time. The final ranks
+    are left in RANKS_FILE.
+
+    Returns the number of iterations and the final L1 change.
+    """
+    names = [EDGES_FILE, DEGREES_FILE, RANKS_FILE, NEXT_FILE, SHARES_FILE]
+    path = {name: os.path.join(directory, name) for name in names}
+    with MappedArray(path[DEGREES_FILE], "i") as degrees:
+        n = len(degrees)
+    if n == 0:
+        MappedArray(path[RANKS_FILE], "d", 0).close()
+        return 0, 0.0
+
+    for name in [RANKS_FILE, NEXT_FILE, SHARES_FILE]:
+        MappedArray(path[name], "d", n).close()
+    with MappedArray(path[RANKS_FILE], "d") as ranks:
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            ranks[start:end] = array("d", [1 / n]) * (end - start)
+
+    iteration, residual = 0, 0.0
+    for iteration in range(1, max_iterations + 1):
+        with MappedArray(path[DEGREES_FILE], "i") as degrees, MappedArray(path[RANKS_FILE], "d") as ranks, \
+                MappedArray(path[SHARES_FILE], "d") as shares, MappedArray(path[NEXT_FILE], "d") as new_ranks, \
+                MappedArray(path[EDGES_FILE], "i") as edges:
+            dangling = 0.0
+            for start in range(0, n, block_size):
+                end = min(start + block_size, n)
+                block = array("d", [0.0]) * (end - start)
+                for j, (rank, degree) in enumerate(zip(ranks[start:end], degrees[start:end])):
+                    if degree:
+                        block[j] = rank / degree
+                    else:
+                        dangling += rank
+                shares[start:end] = block
+                new_ranks[start:end] = array("d", [0.0]) * (end - start)
+
+            # Edges are sorted by target, so the sums are written in order
+            for start in range(0, len(edges), 2 * block_size):
+                pairs = edges[start:start + 2 * block_size].tolist()
+                for k in range(0, len(pairs), 2):
+                    new_ranks[pairs[k]] += shares[pairs[k + 1]]
+
+            base = (1 - damping_factor) / n + damping_factor * dangling / n
+            residual = 0.0
+            for start in range(0, n, block_size):
+                end = min(start + block_size, n)
+                block = array("d", [base + damping_factor * linked for linked in new_ranks[start:end]])
+                residual += sum(abs(new - old) for new, old in zip(block, ranks[start:end]))
+                new_ranks[start:end] = block
+
+        os.replace(path[NEXT_FILE], path[RANKS_FILE] + ".tmp")
+        os.replace(path[RANKS_FILE], path[NEXT_FILE])
+        os.replace(path[RANKS_FILE] + ".tmp", path[RANKS_FILE])
+        if residual <= tolerance:
+            break
+
+    return iteration, residual
+
+
+def read_ranks(directory):
+    """
+    Returns the ranks left in `directory` by `iterate_edge_file`.
+    """
+    ranks = array("d")
+    with open(os.path.join(directory, RANKS_FILE), "rb") as f:
+        ranks.frombytes(f.read())
+    return ranks
@@ -0,0 +1,405 @@
+import random
+from array import array
+from operator import add
+
+# Default L1 distance between successive rank vectors at which iteration stops
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+
+# Power iteration steps between extrapolations in `extrapolated_iterate`
+EXTRAPOLATE_EVERY = 10
+
+# Number of random surfers walking side by side in `sample_walks`
+SURFERS = 1000
+
+# Steps each surfer takes before its visits are counted, so that the
+# uniform start has worn off (its weight shrinks by damping_factor a step)
+BURN_IN = 50
+
+
+class LinkMatrix():
+    """
+    Column-stochastic link matrix of a corpus in compressed sparse form.
+
+    Pages are numbered by their position in `pages`. The pages linking
+    to page `i` are `in_sources[in_offsets[i]:in_offsets[i + 1]]`, and
+    page `j` has `out_degree[j]` outgoing links. Pages without links,
+    listed in `dangling`, are treated as linking to every page.
+    """
+
+    def __init__(self, pages, in_offsets, in_sources, out_degree):
+        self.pages = pages
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+        self.out_degree = out_degree
+        self.dangling = array("i", [j for j in range(len(pages)) if out_degree[j] == 0])
+
+    def __len__(self):
+        return len(self.pages)
+
+    def outbound(self):
+        """
+        Returns the outgoing links in compressed sparse form, as
+        (out_offsets, out_targets), building them on first use.
+        """
+        if getattr(self, "out_offsets", None) is None:
+            n = len(self.pages)
+            out_offsets = array("i", [0]) * (n + 1)
+            for j in range(n):
+                out_offsets[j + 1] = out_offsets[j] + self.out_degree[j]
+            out_targets = array("i", [0]) * out_offsets[-1]
+            fill = out_offsets[:-1]
+            for i in range(n):
+                for j in self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]:
+                    out_targets[fill[j]] = i
+                    fill[j] += 1
+            self.out_offsets, self.out_targets = out_offsets, out_targets
+        return self.out_offsets, self.out_targets
+
+    def to_dict(self, ranks):
+        """
+        Returns a dictionary mapping page names to their rank.
+        """
+        return {page: ranks[i] for i, page in enumerate(self.pages)}
+
+
+def build_link_matrix(corpus):
+    """
+    Returns the LinkMatrix of a corpus, as returned by `crawl`.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    sources, targets = array("i"), array("i")
+    for page in pages:
+        j = index[page]
+        for link in corpus[page]:
+            if link in index:
+                sources.append(j)
+                targets.append(index[link])
+
+    return build_edge_matrix(pages, sources, targets)
+
+
+def build_edge_matrix(pages, sources, targets):
+    """
+    Returns the LinkMatrix of an edge list, where edge `k` is a link
+    from page `sources[k]` to page `targets[k]`, as returned by
+    `crawler.crawl_edges`.
+    """
+    out_degree = array("i", [0]) * len(pages)
+    in_counts = array("i", [0]) * (len(pages) + 1)
+    for j, i in zip(sources, targets):
+        out_degree[j] += 1
+        in_counts[i + 1] += 1
+
+    in_offsets = in_counts
+    for i in range(len(pages)):
+        in_offsets[i + 1] += in_offsets[i]
+
+    in_sources = array("i", [0]) * in_offsets[-1]
+    fill = in_offsets[:-1]
+    for j, i in zip(sources, targets):
+        in_sources[fill[i]] = j
+        fill[i] += 1
+
+    return LinkMatrix(pages, in_offsets, in_sources, out_degree)
+
+
+def warm_start(matrix, ranks):
+    """
+    Returns a starting rank list for a LinkMatrix from a dictionary of
+    earlier ranks by page name. Pages without an earlier rank start at
+    the uniform rank, and the list is rescaled to sum to 1.
+    """
+    n = len(matrix)
+    start = [ranks.get(page, 1 / n) for page in matrix.pages]
+    total = sum(start)
+    if total <= 0:
+        return [1 / n] * n
+    return [rank / total for rank in start]
+
+
+def power_iterate(matrix, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Runs power iteration on a LinkMatrix, starting from `ranks` or the
+    uniform distribution, until the L1 change between iterations is at
+    most `tolerance`.
+
+    Returns the rank list, the number of iterations and the final change.
+    """
+    return extrapolated_iterate(matrix, damping_factor, tolerance, max_iterations, ranks, extrapolation=None)
+
+
+def power_step(matrix, damping_factor, ranks, inverse_degree):
+    """
+    Returns the rank list after one power iteration step.
+    """
+    n = len(matrix)
+    in_offsets = matrix.in_offsets
+    in_sources = matrix.in_sources
+    shares = [rank * inverse for rank, inverse in zip(ranks, inverse_degree)]
+    dangling = sum(ranks[j] for j in matrix.dangling)
+    base = (1 - damping_factor) / n + damping_factor * dangling / n
+
+    return [
+        base + damping_factor * sum(map(shares.__getitem__, in_sources[in_offsets[i]:in_offsets[i + 1]]))
+        for i in range(n)
+    ]
+
+
+def extrapolated_iterate(matrix, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, ranks=None,
+                         extrapolation="quadratic", every=EXTRAPOLATE_EVERY):
+    """
+    Runs power iteration on a LinkMatrix like `power_iterate`, but
+    every `every` steps replaces the ranks by a "quadratic" extrapolation
+    of the last few iterates, which removes the slowest decaying error
+    terms. An extrapolation is kept only if the power step after it
+    changes the ranks less than the step before it did. Iteration stops
+    once a plain power step changes the ranks by at most `tolerance`.
+
+    Returns the rank list, the number of iterations and the final change.
+    """
+    if extrapolation not in EXTRAPOLATIONS:
+        raise ValueError(f"Unknown extrapolation: {extrapolation}")
+    n = len(matrix)
+    if n == 0:
+        return [], 0, 0.0
+    if ranks is None:
+        ranks = [1 / n] * n
+    inverse_degree = [1 / degree if degree else 0.0 for degree in matrix.out_degree]
+    extrapolate = EXTRAPOLATIONS[extrapolation]
+
+    iteration, residual = 0, 0.0
+    history = [ranks]
+    # Iterates to go back to if an extrapolation is not kept
+    fallback = None
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = power_step(matrix, damping_factor, ranks, inverse_degree)
+        change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        if fallback is not None:
+            previous, fallback = fallback, None
+            if change >= residual:
+                history = previous
+                ranks = history[-1]
+                continue
+        residual = change
+        ranks = new_ranks
+        if residual <= tolerance:
+            break
+
+        history = history[-3:] + [ranks]
+        if extrapolate is not None and iteration % every == 0 and len(history) == 4:
+            extrapolated = extrapolate(*history)
+            if extrapolated is not None:
+                fallback = history
+                ranks = extrapolated
+                history = [ranks]
+
+    return ranks, iteration, residual
+
+
+def quadratic_extrapolate(x0, x1, x2, x3):
+    """
+    Returns the quadratic extrapolation of the last four iterates
+    (Kamvar et al., 2003), or None if they are too close to collinear.
+    """
+    y1 = [b - a for a, b in zip(x0, x1)]
+    y2 = [c - a for a, c in zip(x0, x2)]
+    y3 = [d - a for a, d in zip(x0, x3)]
+
+    # Least-squares solution of [y1 y2] gamma = -y3, by the normal equations
+    a11 = sum(u * u for u in y1)
+    a12 = sum(u * v for u, v in zip(y1, y2))
+    a22 = sum(v * v for v in y2)
+    b1 = -sum(u * w for u, w in zip(y1, y3))
+    b2 = -sum(v * w for v, w in zip(y2, y3))
+    determinant = a11 * a22 - a12 * a12
+    if abs(determinant) <= 1e-12 * max(a11 * a22, 1e-300):
+        return None
+    gamma1 = (b1 * a22 - b2 * a12) / determinant
+    gamma2 = (a11 * b2 - a12 * b1) / determinant
+
+    beta0, beta1, beta2 = gamma1 + gamma2 + 1, gamma2 + 1, 1
+    return normalize([max(beta0 * a + beta1 * b + beta2 * c, 0.0) for a, b, c in zip(x1, x2, x3)])
+
+
+def normalize(ranks):
+    total = sum(ranks)
+    return [rank / total for rank in ranks] if total > 0 else None
+
+
+def gauss_seidel_iterate(matrix, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Runs Gauss-Seidel iteration on a LinkMatrix, where each page's new
+    rank is used by the pages after it in the same sweep, starting from
+    `ranks` or the uniform distribution. Ranks are rescaled to sum to 1
+    after each sweep, and iteration stops once a sweep changes them by
+    at most `tolerance`.
+
+    Returns the rank list, the number of sweeps and the final change.
+    """
+    n = len(matrix)
+    if n == 0:
+        return [], 0, 0.0
+    ranks = [1 / n] * n if ranks is None else list(ranks)
+
+    in_offsets = matrix.in_offsets
+    in_sources = matrix.in_sources
+    out_degree = matrix.out_degree
+    inverse_degree = [1 / degree if degree else 0.0 for degree in out_degree]
+    teleport = (1 - damping_factor) / n
+
+    iteration, residual = 0, 0.0
+    for iteration in range(1, max_iterations + 1):
+        previous = ranks[:]
+        shares = [rank * inverse for rank, inverse in zip(ranks, inverse_degree)]
+        dangling = sum(ranks[j] for j in matrix.dangling)
+        for i in range(n):
+            rank = teleport + damping_factor * (
+                dangling / n + sum(map(shares.__getitem__, in_sources[in_offsets[i]:in_offsets[i + 1]])))
+            if out_degree[i]:
+                shares[i] = rank * inverse_degree[i]
+            else:
+                dangling += rank - ranks[i]
+            ranks[i] = rank
+
+        ranks = normalize(ranks)
+        residual = sum(abs(new - old) for new, old in zip(ranks, previous))
+        if residual <= tolerance:
+            break
+
+    return ranks, iteration, residual
+
+
+def personalized_iterate(matrix, damping_factor, teleports, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Runs power iteration on a LinkMatrix for several teleport vectors at
+    once, each a dictionary of page numbers and weights that the surfer
+    jumps to, and also spreads the rank of dangling pages over. The
+    ranks of all vectors are kept side by side, `k` values per page, so
+    each link is visited once per step for all of them.
+
+    Returns a rank list per teleport vector, the number of iterations and
+    the largest final L1 change.
+    """
+    n, k = len(matrix), len(teleports)
+    if n == 0 or k == 0:
+        return [[] for _ in teleports], 0, 0.0
+
+    jump = [0.0] * (n * k)
+    for s, teleport in enumerate(teleports):
+        total = sum(teleport.values())
+        if total <= 0:
+            raise ValueError("Teleport weights must have a positive sum")
+        for i, weight in teleport.items():
+            jump[i * k + s] += weight / total
+
+    in_offsets = matrix.in_offsets
+    in_sources = matrix.in_sources
+    inverse_degree = [1 / degree if degree else 0.0 for degree in matrix.out_degree]
+    ranks = jump[:]
+    zeros = [0.0] * k
+
+    iteration, residual = 0, 0.0
+    for iteration in range(1, max_iterations + 1):
+        shares = []
+        for j in range(n):
+            inverse = inverse_degree[j]
+            shares.extend([rank * inverse for rank in ranks[j * k:j * k + k]])
+        dangling = zeros
+        for j in matrix.dangling:
+            dangling = list(map(add, dangling, ranks[j * k:j * k + k]))
+        scale = [1 - damping_factor + damping_factor * mass for mass in dangling]
+
+        new_ranks = []
+        for i in range(n):
+            total = zeros
+            for j in in_sources[in_offsets[i]:in_offsets[i + 1]]:
+                total = list(map(add, total, shares[j * k:j * k + k]))
+            new_ranks.extend([damping_factor * linked + jumped * weight
+                              for linked, jumped, weight in zip(total, scale, jump[i * k:i * k + k])])
+
+        changes = [abs(new - old) for new, old in zip(new_ranks, ranks)]
+        residual = max(sum(changes[s::k]) for s in range(k))
+        ranks = new_ranks
+        if residual <= tolerance:
+            break
+
+    return [ranks[s::k] for s in range(k)], iteration, residual
+
+
+def solve(matrix, damping_factor, method="power", tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Computes the ranks of a LinkMatrix by one of METHODS, returning the
+    rank list, the number of iterations and the final change.
+    """
+    if method == "power":
+        return power_iterate(matrix, damping_factor, tolerance, max_iterations, ranks)
+    if method == "gauss-seidel":
+        return gauss_seidel_iterate(matrix, damping_factor, tolerance, max_iterations, ranks)
+    if method in EXTRAPOLATIONS and method is not None:
+        return extrapolated_iterate(matrix, damping_factor, tolerance, max_iterations, ranks, extrapolation=method)
+    raise ValueError(f"Unknown method: {method}")
+
+
+def sample_walks(matrix, damping_factor, samples, surfers=SURFERS, seed=None, burn_in=BURN_IN):
+    """
+    Estimates PageRank by random walks on a LinkMatrix, counting
+    `samples` page visits made by up to `surfers` surfers that each
+    start on a random page and take one step per round. Each surfer's
+    first `burn_in` steps are not counted, and there are at most
+    `samples / burn_in` surfers, so at most half the steps are uncounted.
+
+    Returns the fraction of visits made to each page.
+    """
+    n = len(matrix)
+    if n == 0 or samples <= 0:
+        return [0.0] * n
+    rng = random.Random(seed)
+    uniform = rng.random
+    out_offsets, out_targets = matrix.outbound()
+
+    # One uniform draw r picks each step: a link when r < damping_factor,
+    # otherwise a random page, rescaling r onto the chosen range
+    starts = out_offsets[:-1]
+    last = array("i", [max(offset - 1, 0) for offset in out_offsets[1:]])
+    link_scale = [degree / damping_factor if damping_factor else 0.0 for degree in matrix.out_degree]
+    teleport_scale = n / (1 - damping_factor) if damping_factor < 1 else 0.0
+    has_links = [degree > 0 and damping_factor > 0 for degree in matrix.out_degree]
+
+    visits = [0] * n
+    surfers = max(1, min(surfers, samples // max(burn_in, 1)))
+    positions = [int(uniform() * n) for _ in range(surfers)]
+    remaining = samples
+    step = 0
+    while remaining > 0:
+        counted = step >= burn_in
+        step += 1
+        if counted:
+            if len(positions) > remaining:
+                positions = positions[:remaining]
+            remaining -= len(positions)
+
+        draws = [uniform() for _ in positions]
+        moved = []
+        move = moved.append
+        for p, r in zip(positions, draws):
+            if counted:
+                visits[p] += 1
+            if not has_links[p]:
+                move(min(int(r * n), n - 1))
+            elif r < damping_factor:
+                move(out_targets[min(starts[p] + int(r * link_scale[p]), last[p])])
+            else:
+                move(min(int((r - damping_factor) * teleport_scale), n - 1))
+        positions = moved
+
+    return [count / samples for count in visits]
+
+
+# Extrapolation functions by name, taking the last four iterates
+EXTRAPOLATIONS = {None: None, "quadratic": quadratic_extrapolate}
+
+# Iteration methods accepted by `solve`
+METHODS = ["power", "gauss-seidel", "quadratic"]
@@ -2,7 +2,12 @@ import os
 import random
 import re
 import sys
-import copy
+
+from crawler import LinkCache, crawl_edges, stream_edges, CACHE_FILE
+from edgefile import write_edge_file, iterate_edge_file, read_ranks
+from parallel import ParallelPageRank
+from linkgraph import build_link_matrix, build_edge_matrix, power_iterate, sample_walks, solve, warm_start, TOLERANCE
+from linkgraph import personalized_iterate
 
 DAMPING = 0.85
 SAMPLES = 10000
@@ -11,16 +16,27 @@ SAMPLES = 10000
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    directory = sys.argv[1]
+
+    # Only changed pages are parsed, and iteration resumes from the last ranks
+    cache = LinkCache.load(os.path.join(directory, CACHE_FILE))
+    matrix = build_edge_matrix(*crawl_edges(directory, cache=cache))
+    ranks = matrix.to_dict(sample_walks(matrix, DAMPING, SAMPLES))
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    ranks, _, _ = power_iterate(matrix, DAMPING, ranks=warm_start(matrix, cache.ranks))
+    ranks = matrix.to_dict(ranks)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
 
+    cache.ranks = ranks
+    try:
+        cache.save()
+    except OSError:
+        pass
+
 
 def crawl(directory):
     """
@@ -114,6 +130,20 @@ def sample_pagerank(corpus, damping_factor, n):
     return result        
 
 
+def fast_sample_pagerank(corpus, damping_factor, n, seed=None):
+    """
+    Return PageRank values for each page by counting the pages visited
+    in `n` random-surfer steps, taken by many surfers side by side over
+    link arrays built once.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    matrix = build_link_matrix(corpus)
+    return matrix.to_dict(sample_walks(matrix, damping_factor, n, seed=seed))
+
+
 def iterate_pagerank(corpus, damping_factor):
     """
     Return PageRank values for each page by iteratively updating
@@ -126,6 +156,7 @@ def iterate_pagerank(corpus, damping_factor):
     pagerank_threshold = 0.001
     N = len(corpus)
     randomRank = (1-damping_factor)/N
+    index = build_link_index(corpus)
     pageranks = {}
     for page in corpus.keys():
         pageranks[page] = 1 / N
@@ -133,9 +164,12 @@ def iterate_pagerank(corpus, damping_factor):
     iterate_more = True
     while iterate_more:
         iterate_more = False
-        previous_pageranks = copy.deepcopy(pageranks)
+        previous_pageranks = dict(pageranks)
+
+        # Pages without links share their rank with every page
+        danglingRank = damping_factor * sum(previous_pageranks[page] for page in index["dangling"]) / N
         for page in corpus.keys():
-            pageranks[page] = pagerank(corpus, previous_pageranks, page, damping_factor, randomRank)
+            pageranks[page] = pagerank(corpus, previous_pageranks, page, damping_factor, randomRank + danglingRank, index)
 
         for page in pageranks:
             if abs(previous_pageranks[page]-pageranks[page]) > pagerank_threshold:
@@ -145,9 +179,93 @@ def iterate_pagerank(corpus, damping_factor):
     return previous_pageranks
 
 
-def pagerank(corpus, pageranks, page, damping_factor, randomRank):
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE, ranks=None, method="power"):
+    """
+    Return PageRank values for each page by iterating over a sparse
+    link matrix built once, until the L1 change between iterations is
+    at most `tolerance`. `method` is one of `linkgraph.METHODS`. If
+    `ranks` holds the PageRank values of an earlier run, iteration
+    starts from them.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    matrix = build_link_matrix(corpus)
+    if ranks is not None:
+        ranks = warm_start(matrix, ranks)
+    ranks, _, _ = solve(matrix, damping_factor, method, tolerance, ranks=ranks)
+    return matrix.to_dict(ranks)
+
+
+def disk_pagerank(directory, damping_factor, work_directory, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page of a directory of HTML pages,
+    keeping the link graph and rank vectors in files in `work_directory`
+    rather than in memory; see `edgefile.iterate_edge_file`. Links are
+    streamed from the pages into the edge file as they are parsed.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, edges = stream_edges(directory)
+    write_edge_file(work_directory, len(pages), edges)
+    iterate_edge_file(work_directory, damping_factor, tolerance)
+    return dict(zip(pages, read_ranks(work_directory)))
+
+
+def parallel_pagerank(corpus, damping_factor, processes=None, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page by power iteration split
+    across `processes` worker processes; see `parallel.ParallelPageRank`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    matrix = build_link_matrix(corpus)
+    with ParallelPageRank(matrix, processes) as engine:
+        ranks, _, _ = engine.iterate(damping_factor, tolerance)
+    return matrix.to_dict(ranks)
+
+
+def personalized_pagerank(corpus, damping_factor, seeds, tolerance=TOLERANCE):
+    """
+    Return personalized PageRank values for each of `seeds`. A seed is
+    a set of pages, or a dictionary of pages and weights, that the
+    random surfer jumps to in place of a page chosen at random from the
+    whole corpus. All seeds are solved together over one link matrix.
+
+    Return a list holding, for each seed, a dictionary where keys are
+    page names, and values are their PageRank value for that seed.
+    """
+    matrix = build_link_matrix(corpus)
+    index = {page: i for i, page in enumerate(matrix.pages)}
+    teleports = []
+    for seed in seeds:
+        weights = seed if isinstance(seed, dict) else dict.fromkeys(seed, 1)
+        teleports.append({index[page]: weight for page, weight in weights.items()})
+
+    ranks, _, _ = personalized_iterate(matrix, damping_factor, teleports, tolerance)
+    return [matrix.to_dict(seed_ranks) for seed_ranks in ranks]
+
+
+def pagerank(corpus, pageranks, page, damping_factor, randomRank, index=None):
+    """
+    Return the PageRank of `page` given the current PageRank values.
+
+    If `index` is a link index from `build_link_index`, only the pages
+    that link to `page` are visited, and the rank shared by pages
+    without links must already be included in `randomRank`.
+    """
     sum = 0
 
+    if index is not None:
+        for link in index["inbound"][page]:
+            sum += (pageranks[link] / index["out_degree"][link])
+        return randomRank + (damping_factor * sum)
+
     for link in links_to_page(corpus, page):
         num_links = len(corpus[link])
         if num_links == 0:
@@ -158,7 +276,14 @@ def pagerank(corpus, pageranks, page, damping_factor, randomRank):
     return randomRank + (damping_factor * sum)
     
 
-def links_to_page(corpus, page):
+def links_to_page(corpus, page, index=None):
+    """
+    Return the set of pages that link to `page`, counting pages
+    without links as linking to every page.
+    """
+    if index is not None:
+        return index["inbound"][page] | index["dangling"]
+
     links = set()
     for currentPage in corpus.keys():
         if page in corpus[currentPage] or corpus[currentPage] == set():
@@ -167,5 +292,28 @@ def links_to_page(corpus, page):
     return links
 
 
+def build_link_index(corpus):
+    """
+    Return a reverse-link index of a corpus, built in one pass over
+    its links: a dictionary with "inbound" mapping each page to the set
+    of pages linking to it, "out_degree" mapping each page to its number
+    of links, and "dangling" holding the set of pages without links.
+    Links to pages outside the corpus count towards the out-degree but
+    are not indexed.
+    """
+    inbound = {page: set() for page in corpus}
+    out_degree = {}
+    dangling = set()
+    for page, links in corpus.items():
+        out_degree[page] = len(links)
+        if len(links) == 0:
+            dangling.add(page)
+        for link in links:
+            if link in inbound:
+                inbound[link].add(page)
+
+    return {"inbound": inbound, "out_degree": out_degree, "dangling": dangling}
+
+
 if __name__ == "__main__":
     main()
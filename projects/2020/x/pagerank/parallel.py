@@ -0,0 +1,156 @@
+import os
+from array import array
+from bisect import bisect_left
+from multiprocessing import Pool, shared_memory
+
+from linkgraph import TOLERANCE, MAX_ITERATIONS
+
+# Blocks of pages per worker process, so faster workers can take more
+BLOCKS_PER_PROCESS = 4
+
+# Shared arrays attached by each worker process of a ParallelPageRank pool
+worker_arrays = None
+worker_memory = None
+
+
+class ParallelPageRank():
+    """
+    Power iteration over a LinkMatrix whose link arrays and rank vectors
+    live in shared memory. Pages are split into blocks of roughly equal
+    work, and each iteration has two steps that a process pool runs
+    block by block: computing each page's share of rank along its
+    links, then each page's new rank from the shares of the pages
+    linking to it. The pool's map returning is the barrier between steps.
+    """
+
+    def __init__(self, matrix, processes=None, blocks=None):
+        self.matrix = matrix
+        self.memory = []
+        self.views = []
+        n = len(matrix)
+        inverse_degree = array("d", [1 / degree if degree else 0.0 for degree in matrix.out_degree])
+        self.arrays = [
+            self.share(array("i", matrix.in_offsets).tobytes(), "i"),
+            self.share(array("i", matrix.in_sources).tobytes(), "i"),
+            self.share(inverse_degree.tobytes(), "d"),
+        ]
+        # Shares, then two rank vectors used in turn as current and next
+        for _ in range(3):
+            self.arrays.append(self.share(bytes(8 * n), "d"))
+
+        segments = [(memory.name, view.nbytes, typecode)
+                    for memory, view, typecode in zip(self.memory, self.views[::2], "iidddd")]
+        self.processes = processes or os.cpu_count()
+        self.blocks = partition(matrix.in_offsets, blocks or self.processes * BLOCKS_PER_PROCESS)
+        self.pool = Pool(self.processes, initializer=attach_worker, initargs=(segments,))
+
+    def share(self, data, typecode):
+        """
+        Copies `data` into a new shared memory segment and returns
+        a view of it as an array of `typecode` items.
+        """
+        memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        view = memory.buf[:len(data)]
+        view[:] = data
+        self.memory.append(memory)
+        self.views.extend([view, view.cast(typecode)])
+        return self.views[-1]
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.arrays = []
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def iterate(self, damping_factor, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, ranks=None):
+        """
+        Runs power iteration from `ranks` or the uniform distribution
+        until the L1 change between iterations is at most `tolerance`.
+
+        Returns the rank list, the number of iterations and the final change.
+        """
+        n = len(self.matrix)
+        if n == 0:
+            return [], 0, 0.0
+        current = 0
+        self.arrays[4][:] = array("d", [1 / n] * n if ranks is None else ranks)
+
+        iteration, residual = 0, 0.0
+        for iteration in range(1, max_iterations + 1):
+            dangling = sum(self.pool.map(share_block, [(start, end, current) for start, end in self.blocks]))
+            base = (1 - damping_factor) / n + damping_factor * dangling / n
+            residual = sum(self.pool.map(
+                rank_block, [(start, end, current, base, damping_factor) for start, end in self.blocks]))
+            current = 1 - current
+            if residual <= tolerance:
+                break
+
+        return self.arrays[4 + current].tolist(), iteration, residual
+
+
+def partition(in_offsets, blocks):
+    """
+    Returns (start, end) ranges splitting the pages into at most
+    `blocks` contiguous blocks of about equal pages plus inbound links.
+    """
+    n = len(in_offsets) - 1
+    total = n + in_offsets[-1]
+    work = [i + in_offsets[i] for i in range(n + 1)]
+    bounds = [0]
+    for b in range(1, blocks):
+        bound = bisect_left(work, total * b // blocks)
+        if bounds[-1] < bound < n:
+            bounds.append(bound)
+    bounds.append(n)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def share_block(block):
+    """
+    Writes the share of rank each page of a block passes along each
+    of its links, returning the total rank of the block's dangling pages.
+    """
+    start, end, current = block
+    _, _, inverse_degree, shares = worker_arrays[:4]
+    ranks = worker_arrays[4 + current]
+    dangling = 0.0
+    for j in range(start, end):
+        if inverse_degree[j]:
+            shares[j] = ranks[j] * inverse_degree[j]
+        else:
+            dangling += ranks[j]
+    return dangling
+
+
+def rank_block(block):
+    """
+    Writes the next ranks of the pages of a block, returning their
+    L1 change.
+    """
+    start, end, current, base, damping_factor = block
+    in_offsets, in_sources, _, shares = worker_arrays[:4]
+    ranks, new_ranks = worker_arrays[4 + current], worker_arrays[5 - current]
+    residual = 0.0
+    for i in range(start, end):
+        rank = base + damping_factor * sum(map(shares.__getitem__, in_sources[in_offsets[i]:in_offsets[i + 1]]))
+        residual += abs(rank - ranks[i])
+        new_ranks[i] = rank
+    return residual
+
+
+def attach_worker(segments):
+    global worker_arrays, worker_memory
+    worker_memory = [shared_memory.SharedMemory(name=name) for name, _, _ in segments]
+    worker_arrays = [memory.buf[:size].cast(typecode) for memory, (_, size, typecode) in zip(worker_memory, segments)]
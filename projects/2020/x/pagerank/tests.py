@@ -1,5 +1,17 @@
+import os
+import random
+import shutil
+import tempfile
 import unittest
-from pagerank import transition_model, sample_pagerank, iterate_pagerank, links_to_page
+from array import array
+from pagerank import transition_model, sample_pagerank, iterate_pagerank, links_to_page, sparse_pagerank, crawl
+from pagerank import build_link_index, fast_sample_pagerank, personalized_pagerank, disk_pagerank
+from pagerank import parallel_pagerank, DAMPING, SAMPLES
+from edgefile import write_edge_file, iterate_edge_file, read_ranks, EDGES_FILE
+from parallel import ParallelPageRank, partition
+from linkgraph import SURFERS, build_link_matrix, build_edge_matrix, power_iterate, sample_walks, warm_start, solve, METHODS
+import crawler
+from crawler import LinkExtractor, LinkCache, crawl_edges, stream_edges, edges_to_corpus
 
 class TestPageRank(unittest.TestCase):
     def test_transition_model_example(self):
@@ -84,5 +96,267 @@ class TestPageRank(unittest.TestCase):
         self.assertEqual(0.1307, round(result["4.html"], 4))
 
 
+    def test_build_link_index(self):
+        corpus = {"1.html": {"2.html", "3.html"}, "2.html": {"3.html"}, "3.html": {"2.html"}, "4.html": set()}
+        index = build_link_index(corpus)
+        self.assertEqual(index["inbound"]["3.html"], {"1.html", "2.html"})
+        self.assertEqual(index["inbound"]["1.html"], set())
+        self.assertEqual(index["out_degree"]["1.html"], 2)
+        self.assertEqual(index["dangling"], {"4.html"})
+
+    def test_link_index_skips_links_outside_corpus(self):
+        corpus = {"1.html": {"2.html", "x.html"}, "2.html": {"1.html"}}
+        index = build_link_index(corpus)
+        self.assertEqual(set(index["inbound"]), {"1.html", "2.html"})
+        self.assertEqual(index["out_degree"]["1.html"], 2)
+        result = iterate_pagerank(corpus, 0.85)
+        self.assertEqual(0.2178, round(result["1.html"], 4))
+        self.assertEqual(0.1681, round(result["2.html"], 4))
+
+    def test_links_to_page_with_index(self):
+        corpus = {"1.html": {"2.html", "3.html"}, "2.html": {"3.html"}, "3.html": {"2.html"}, "4.html": set()}
+        index = build_link_index(corpus)
+        for page in corpus:
+            self.assertEqual(links_to_page(corpus, page), links_to_page(corpus, page, index))
+
+    def test_build_link_matrix(self):
+        corpus = {"1.html": {"2.html", "3.html"}, "2.html": {"3.html"}, "3.html": {"2.html"}, "4.html": set()}
+        matrix = build_link_matrix(corpus)
+        self.assertEqual(matrix.pages, ["1.html", "2.html", "3.html", "4.html"])
+        self.assertEqual(list(matrix.out_degree), [2, 1, 1, 0])
+        self.assertEqual(list(matrix.dangling), [3])
+        self.assertEqual(sorted(matrix.in_sources[matrix.in_offsets[2]:matrix.in_offsets[3]]), [0, 1])
+
+    def test_sparse_pagerank_corpus0(self):
+        corpus = {"1.html": {"2.html"}, "2.html": {"1.html", "3.html"}, "3.html": {"2.html", "4.html"}, "4.html": {"2.html"}}
+        result = sparse_pagerank(corpus, 0.85)
+        self.assertEqual(1, round(sum(result.values()), 6))
+        self.assertEqual(0.2199, round(result["1.html"], 4))
+        self.assertEqual(0.4292, round(result["2.html"], 4))
+        self.assertEqual(0.2199, round(result["3.html"], 4))
+        self.assertEqual(0.1310, round(result["4.html"], 4))
+
+    def test_sparse_pagerank_matches_iteration(self):
+        corpus = crawl("corpus2")
+        expected = iterate_pagerank(corpus, 0.85)
+        result = sparse_pagerank(corpus, 0.85)
+        for page in corpus:
+            self.assertAlmostEqual(expected[page], result[page], places=2)
+
+    def test_power_iterate_reports_convergence(self):
+        matrix = build_link_matrix({"1.html": {"2.html"}, "2.html": set()})
+        ranks, iterations, residual = power_iterate(matrix, 0.85, tolerance=1e-10)
+        self.assertLessEqual(residual, 1e-10)
+        self.assertGreater(iterations, 1)
+        self.assertAlmostEqual(sum(ranks), 1)
+
+    def test_outbound_links(self):
+        matrix = build_link_matrix({"1.html": {"2.html", "3.html"}, "2.html": {"3.html"}, "3.html": set()})
+        out_offsets, out_targets = matrix.outbound()
+        self.assertEqual(list(out_offsets), [0, 2, 3, 3])
+        self.assertEqual(sorted(out_targets[0:2]), [1, 2])
+        self.assertEqual(list(out_targets[2:3]), [2])
+
+    def test_sample_walks_counts_visits(self):
+        matrix = build_link_matrix({"1.html": {"2.html"}, "2.html": set(), "3.html": {"1.html"}})
+        frequencies = sample_walks(matrix, 0.85, 2501, surfers=100, seed=1)
+        self.assertEqual(2501, round(sum(frequencies) * 2501))
+
+    def test_sample_walks_unbiased_at_main_settings(self):
+        matrix = build_link_matrix(crawl("corpus2"))
+        expected, _, _ = power_iterate(matrix, 0.85, 1e-10)
+        runs = 40
+        average = [0.0] * len(matrix)
+        for seed in range(runs):
+            frequencies = sample_walks(matrix, DAMPING, SAMPLES, SURFERS, seed=seed)
+            average = [total + frequency / runs for total, frequency in zip(average, frequencies)]
+        for rank, expected_rank in zip(average, expected):
+            self.assertAlmostEqual(expected_rank, rank, delta=0.004)
+
+    def test_fast_sample_pagerank_matches_iteration(self):
+        corpus = {"1.html": {"2.html"}, "2.html": {"1.html", "3.html"}, "3.html": {"2.html", "4.html"}, "4.html": set()}
+        expected = sparse_pagerank(corpus, 0.85)
+        result = fast_sample_pagerank(corpus, 0.85, 200000, seed=0)
+        for page in corpus:
+            self.assertAlmostEqual(expected[page], result[page], places=2)
+
+    def test_link_extractor_across_chunks(self):
+        html = '<p>See <a class="x" href="a.html">A</a> and <a href="b.html">B</a>.</p>'
+        for size in range(1, len(html) + 1):
+            extractor = LinkExtractor()
+            for i in range(0, len(html), size):
+                extractor.feed(html[i:i + size])
+            self.assertEqual({"a.html", "b.html"}, extractor.close())
+
+    def test_crawl_edges_matches_crawl(self):
+        for directory in ["corpus0", "corpus1", "corpus2"]:
+            pages, sources, targets = crawl_edges(directory, chunk_size=16)
+            self.assertEqual(crawl(directory), edges_to_corpus(pages, sources, targets))
+
+    def test_stream_edges_matches_crawl_edges(self):
+        for directory in ["corpus0", "corpus1", "corpus2"]:
+            pages, sources, targets = crawl_edges(directory)
+            streamed_pages, edges = stream_edges(directory, chunk_size=16)
+            self.assertEqual(pages, streamed_pages)
+            self.assertEqual(list(zip(sources, targets)), list(edges))
+
+    def test_crawl_edges_in_processes(self):
+        threshold = crawler.PARALLEL_THRESHOLD
+        crawler.PARALLEL_THRESHOLD = 0
+        try:
+            pages, sources, targets = crawl_edges("corpus2", processes=2)
+        finally:
+            crawler.PARALLEL_THRESHOLD = threshold
+        self.assertEqual(crawl("corpus2"), edges_to_corpus(pages, sources, targets))
+        matrix = build_edge_matrix(pages, sources, targets)
+        self.assertEqual(list(build_link_matrix(crawl("corpus2")).out_degree), list(matrix.out_degree))
+
+    def test_link_cache_reparses_changed_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for filename in os.listdir("corpus2"):
+                shutil.copy(os.path.join("corpus2", filename), directory)
+            path = os.path.join(directory, crawler.CACHE_FILE)
+            cache = LinkCache(path)
+            crawl_edges(directory, cache=cache)
+            cache.save()
+
+            with open(os.path.join(directory, "ai.html"), "w") as f:
+                f.write('<a href="c.html">C</a>')
+            parsed = []
+            extract_links = crawler.extract_links
+            crawler.extract_links = lambda path, chunk_size: parsed.append(os.path.basename(path)) or extract_links(path)
+            try:
+                cache = LinkCache.load(path)
+                pages, sources, targets = crawl_edges(directory, cache=cache)
+            finally:
+                crawler.extract_links = extract_links
+            self.assertEqual(["ai.html"], parsed)
+            self.assertEqual(crawl(directory), edges_to_corpus(pages, sources, targets))
+            self.assertEqual(["c.html"], cache.files["ai.html"]["links"])
+
+    def test_warm_start(self):
+        matrix = build_link_matrix({"1.html": {"2.html"}, "2.html": {"1.html"}, "3.html": set()})
+        start = warm_start(matrix, {"1.html": 0.5, "2.html": 0.25, "4.html": 0.25})
+        self.assertAlmostEqual(1, sum(start))
+        self.assertGreater(start[0], start[1])
+
+        corpus = crawl("corpus2")
+        cold = build_link_matrix(corpus)
+        ranks = sparse_pagerank(corpus, 0.85)
+        _, cold_iterations, _ = power_iterate(cold, 0.85)
+        _, warm_iterations, _ = power_iterate(cold, 0.85, ranks=warm_start(cold, ranks))
+        self.assertLess(warm_iterations, cold_iterations)
+        warm = sparse_pagerank(corpus, 0.85, ranks=ranks)
+        for page in corpus:
+            self.assertAlmostEqual(ranks[page], warm[page], places=5)
+
+    def test_methods_agree(self):
+        matrix = build_link_matrix(crawl("corpus2"))
+        expected, power_iterations, _ = solve(matrix, 0.85, "power", tolerance=1e-10)
+        for method in METHODS:
+            ranks, iterations, residual = solve(matrix, 0.85, method, tolerance=1e-10)
+            self.assertLessEqual(residual, 1e-10)
+            self.assertAlmostEqual(1, sum(ranks))
+            for rank, expected_rank in zip(ranks, expected):
+                self.assertAlmostEqual(expected_rank, rank, places=8)
+            self.assertLessEqual(iterations, power_iterations)
+            if method != "power":
+                self.assertLess(iterations, power_iterations)
+
+    def test_extrapolation_never_slower_than_power(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            pages = [f"{i}.html" for i in range(300)]
+            corpus = {page: set(rng.sample(pages, rng.randrange(8))) - {page} for page in pages}
+            matrix = build_link_matrix(corpus)
+            _, power_iterations, _ = solve(matrix, 0.85, "power", tolerance=1e-10)
+            _, iterations, _ = solve(matrix, 0.85, "quadratic", tolerance=1e-10)
+            self.assertLessEqual(iterations, power_iterations)
+
+    def test_sparse_pagerank_gauss_seidel_with_dangling_pages(self):
+        corpus = {"1.html": {"2.html"}, "2.html": {"1.html", "3.html"}, "3.html": {"2.html", "4.html"}, "4.html": set()}
+        expected = sparse_pagerank(corpus, 0.85)
+        result = sparse_pagerank(corpus, 0.85, method="gauss-seidel")
+        for page in corpus:
+            self.assertAlmostEqual(expected[page], result[page], places=5)
+
+    def test_solve_unknown_method(self):
+        with self.assertRaises(ValueError):
+            solve(build_link_matrix({"1.html": set()}), 0.85, "jacobi")
+
+    def test_personalized_pagerank_uniform_seed(self):
+        corpus = crawl("corpus2")
+        expected = sparse_pagerank(corpus, 0.85, tolerance=1e-9)
+        result, = personalized_pagerank(corpus, 0.85, [set(corpus)], tolerance=1e-9)
+        for page in corpus:
+            self.assertAlmostEqual(expected[page], result[page], places=7)
+
+    def test_personalized_pagerank_batch_matches_single(self):
+        corpus = {"1.html": {"2.html"}, "2.html": {"1.html", "3.html"}, "3.html": {"2.html", "4.html"}, "4.html": set()}
+        seeds = [{"1.html"}, {"3.html": 3, "4.html": 1}, {"4.html"}]
+        batch = personalized_pagerank(corpus, 0.85, seeds, tolerance=1e-9)
+        for seed, result in zip(seeds, batch):
+            single, = personalized_pagerank(corpus, 0.85, [seed], tolerance=1e-9)
+            self.assertAlmostEqual(1, sum(result.values()))
+            for page in corpus:
+                self.assertAlmostEqual(single[page], result[page], places=9)
+        self.assertGreater(batch[0]["1.html"], batch[2]["1.html"])
+        self.assertGreater(batch[2]["4.html"], batch[0]["4.html"])
+
+    def test_write_edge_file_sorts_by_target(self):
+        edges = [(0, 2), (3, 1), (1, 2), (2, 0), (0, 1), (3, 0)]
+        with tempfile.TemporaryDirectory() as directory:
+            write_edge_file(directory, 4, edges, run_size=4)
+            written = array("i")
+            with open(os.path.join(directory, EDGES_FILE), "rb") as f:
+                written.frombytes(f.read())
+            self.assertEqual([0, 2, 0, 3, 1, 0, 1, 3, 2, 0, 2, 1], list(written))
+            self.assertEqual(["degrees.bin", "edges.bin"], sorted(os.listdir(directory)))
+
+    def test_iterate_edge_file_matches_power_iteration(self):
+        pages, sources, targets = crawl_edges("corpus2")
+        expected, expected_iterations, _ = power_iterate(build_edge_matrix(pages, sources, targets), 0.85, 1e-9)
+        with tempfile.TemporaryDirectory() as directory:
+            write_edge_file(directory, len(pages), zip(sources, targets), run_size=5)
+            iterations, residual = iterate_edge_file(directory, 0.85, 1e-9, block_size=3)
+            ranks = read_ranks(directory)
+        self.assertEqual(expected_iterations, iterations)
+        self.assertLessEqual(residual, 1e-9)
+        for rank, expected_rank in zip(ranks, expected):
+            self.assertAlmostEqual(expected_rank, rank, places=12)
+
+    def test_disk_pagerank(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = disk_pagerank("corpus0", 0.85, directory)
+        self.assertEqual(0.2199, round(result["1.html"], 4))
+        self.assertEqual(0.4292, round(result["2.html"], 4))
+
+    def test_partition(self):
+        blocks = partition([0, 4, 4, 5, 9, 9, 9], 3)
+        self.assertEqual(0, blocks[0][0])
+        self.assertEqual(6, blocks[-1][1])
+        for (_, end), (start, _) in zip(blocks, blocks[1:]):
+            self.assertEqual(end, start)
+        self.assertEqual([(0, 6)], partition([0, 4, 4, 5, 9, 9, 9], 1))
+
+    def test_parallel_pagerank_matches_iteration(self):
+        corpus = crawl("corpus2")
+        expected = iterate_pagerank(corpus, 0.85)
+        result = parallel_pagerank(corpus, 0.85, processes=2)
+        for page in corpus:
+            self.assertAlmostEqual(expected[page], result[page], places=2)
+
+    def test_parallel_iterate_matches_power_iteration(self):
+        corpus = {"1.html": {"2.html"}, "2.html": {"1.html", "3.html"}, "3.html": {"2.html", "4.html"}, "4.html": set()}
+        matrix = build_link_matrix(corpus)
+        expected, expected_iterations, _ = power_iterate(matrix, 0.85, 1e-10)
+        with ParallelPageRank(matrix, processes=2, blocks=3) as engine:
+            ranks, iterations, residual = engine.iterate(0.85, 1e-10)
+        self.assertEqual(expected_iterations, iterations)
+        self.assertLessEqual(residual, 1e-10)
+        for rank, expected_rank in zip(ranks, expected):
+            self.assertAlmostEqual(expected_rank, rank, places=12)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file